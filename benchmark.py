@@ -0,0 +1,211 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import time
+from collections import deque
+from typing import List, NamedTuple, Dict, Callable, Optional
+
+from computer import IntCodeComputer, IO, RandomAccessMemory, \
+    FlatRandomAccessMemory, PagedRandomAccessMemory
+from day_11 import Map, MapIO
+from day_13 import Screen, ArcadeIO
+from profiler import Profiler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MEMORY_TYPES = {
+    "dict": RandomAccessMemory,
+    "flat": FlatRandomAccessMemory,
+    "paged": PagedRandomAccessMemory,
+}
+
+ENGINES = {
+    "interpreter": False,
+    "compiled": True,
+}
+
+
+class ListIO(IO):
+    """Feeds fixed inputs and keeps the outputs"""
+    inputs: deque
+    outputs: List[int]
+    chunk_size = 64
+
+    def __init__(self, inputs: List[int]):
+        self.inputs = deque(inputs)
+        self.outputs = []
+
+    def input(self) -> str:
+        return str(self.inputs.popleft())
+
+    def output_chunk(self, values: List[int]) -> None:
+        self.outputs += values
+
+
+class Workload(NamedTuple):
+    name: str
+    program: List[int]
+    create_io: Callable[[], IO]
+    setup: Callable[[IntCodeComputer], None]
+
+
+class Result(NamedTuple):
+    workload: str
+    engine: str
+    memory: str
+    seconds: float
+    instructions: int
+    instructions_per_second: float
+    opcodes: Dict[int, int]
+    memory_footprint: int  # bytes, memory never shrinks so it is the peak
+
+
+def embedded_program(file_name: str) -> List[int]:
+    """Takes the longest program written out in a puzzle module."""
+    with open(os.path.join(HERE, file_name)) as source:
+        lines = re.findall(r"^-?\d+(?:,-?\d+)+$", source.read(),
+                           re.MULTILINE)
+    return [int(x) for x in max(lines, key=len).split(",")]
+
+
+def countdown_program(n: int) -> List[int]:
+    """A position mode loop decrementing a counter from n to zero."""
+    return [1101, 0, n, 100,  # [100] = n
+            1001, 100, -1, 100,  # [100] -= 1
+            1005, 100, 4,  # loop while [100] != 0
+            99]
+
+
+def relative_loop_program(n: int) -> List[int]:
+    """A relative mode loop with a comparison in each iteration."""
+    return [109, 200,  # rb = 200
+            21101, 0, n, 0,  # [rb] = n
+            21201, 0, -1, 0,  # [rb] -= 1
+            21207, 0, 1, 1,  # [rb + 1] = [rb] < 1
+            1206, 1, 6,  # loop while not [rb + 1]
+            99]
+
+
+def no_setup(computer: IntCodeComputer):
+    pass
+
+
+def insert_coins(computer: IntCodeComputer):
+    computer.hard_set_memory_cell(0, 2)
+
+
+def workloads() -> List[Workload]:
+    return [
+        Workload("day 9 BOOST", embedded_program("day_09.py"),
+                 lambda: ListIO([2]), no_setup),
+        Workload("day 11 robot", embedded_program("day_11.py"),
+                 lambda: MapIO(Map()), no_setup),
+        Workload("day 13 arcade", embedded_program("day_13.py"),
+                 lambda: ArcadeIO(Screen()), insert_coins),
+        Workload("countdown loop", countdown_program(200000),
+                 lambda: ListIO([]), no_setup),
+        Workload("relative loop", relative_loop_program(200000),
+                 lambda: ListIO([]), no_setup),
+    ]
+
+
+def run_workload(workload: Workload, engine: str, memory: str,
+                 opcodes: Dict[int, int]) -> Result:
+    """Times a run, the opcode counts come from a profiled run as they are
+    the same for every engine and memory."""
+    computer = IntCodeComputer(workload.program, workload.create_io(),
+                               MEMORY_TYPES[memory], ENGINES[engine])
+    workload.setup(computer)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        computer.run()
+        seconds = time.perf_counter() - start
+
+    return Result(workload.name, engine, memory, seconds, computer.cycles,
+                  computer.cycles / seconds, opcodes,
+                  computer.memory.footprint())
+
+
+def profile_workload(workload: Workload) -> Profiler:
+    profiler = Profiler()
+    computer = IntCodeComputer(workload.program, workload.create_io())
+    workload.setup(computer)
+    with contextlib.redirect_stdout(io.StringIO()):
+        computer.run(profiler)
+    return profiler
+
+
+def save_profile(workload: Workload, profiler: Profiler, directory: str):
+    name = workload.name.replace(" ", "_")
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name + ".json"), "w") as output:
+        profiler.write_json(output)
+    with open(os.path.join(directory, name + ".folded"), "w") as output:
+        profiler.write_collapsed(output)
+
+
+def print_result(result: Result, baseline: Optional[Result] = None):
+    line = "{:<16} {:<12} {:<6} {:>9.3f}s {:>10} instr {:>12.0f} instr/s " \
+           "{:>9} B".format(result.workload, result.engine, result.memory,
+                            result.seconds, result.instructions,
+                            result.instructions_per_second,
+                            result.memory_footprint)
+    if baseline is not None:
+        line += "  {:+.1%}".format(result.instructions_per_second
+                                   / baseline.instructions_per_second - 1)
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures the speed of the Intcode computer.")
+    parser.add_argument("--engine", choices=ENGINES, action="append")
+    parser.add_argument("--memory", choices=MEMORY_TYPES, action="append")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline",
+                        help="JSON results to compare the speed with")
+    parser.add_argument("--opcodes", action="store_true",
+                        help="print the instruction counts by opcode")
+    parser.add_argument("--profile", metavar="DIRECTORY",
+                        help="save JSON profiles and collapsed stacks")
+    arguments = parser.parse_args()
+
+    baseline = {}
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            for item in json.load(baseline_file):
+                result = Result(**item)
+                baseline[result.workload, result.engine,
+                         result.memory] = result
+
+    results = []
+    for workload in workloads():
+        # a single untimed, profiled run counts the opcodes
+        profiler = profile_workload(workload)
+        opcodes = dict(profiler.opcode_counts)
+
+        for engine in arguments.engine or ENGINES:
+            for memory in arguments.memory or MEMORY_TYPES:
+                result = run_workload(workload, engine, memory, opcodes)
+                results.append(result)
+                print_result(result,
+                             baseline.get((workload.name, engine, memory)))
+        if arguments.opcodes:
+            print("  opcodes:", ", ".join(
+                "{}: {}".format(opcode, count)
+                for opcode, count in sorted(results[-1].opcodes.items())))
+        if arguments.profile:
+            save_profile(workload, profiler, arguments.profile)
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump([result._asdict() for result in results], output_file,
+                      indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,18 @@
 import fileinput
 from enum import IntEnum
-from typing import List, NamedTuple, Dict
+from typing import List, NamedTuple, Dict, Tuple, Type, Union, Callable, \
+    Optional, Set, FrozenSet, Deque
+
+from profiler import Profiler, ProfiledIO
+from transcript import TranscriptWriter, INPUT, OUTPUT
 import itertools
+from collections import deque
+import sys
+import time
 
 
 class IO(object):
+    chunk_size: int = 1  # number of values passed to output_chunk at once
 
     def input(self) -> str:
         raise NotImplementedError
@@ -12,45 +20,52 @@ class IO(object):
     def output(self, out: str) -> None:
         raise NotImplementedError
 
+    def output_chunk(self, values: List[int]) -> None:
+        """Receives `chunk_size` output values at once, except for the last
+        chunk which may be shorter when the program halts. The list is
+        handed over to the IO and is not reused by the computer."""
+        for value in values:
+            self.output(str(value))
 
-class Argument(object):
-    address_index: int
-
-    def __init__(self, address: int):
-        self.address_index = address
-
-    def value(self, computer: 'IntCodeComputer') -> int:
-        raise NotImplementedError
-
-    def address(self, computer: 'IntCodeComputer'):
-        raise NotImplementedError
 
+class ConsoleIO(IO):
+    """Reads inputs from the standard input and prints the outputs"""
 
-class ImmediateArgument(Argument):
+    def input(self) -> str:
+        return input()
 
-    def value(self, computer: 'IntCodeComputer') -> int:
-        return self.address_index
+    def output(self, out: str) -> None:
+        print(out)
 
-    def address(self, computer: 'IntCodeComputer'):
-        raise ValueError("Immeadiate argument should not do this")
 
+class Instruction(NamedTuple):
+    """A decoded opcode word"""
+    opcode: int
+    modes: Tuple[int, int, int]  # parameter modes, first parameter first
+    length: int  # number of memory cells taken including the opcode
 
-class AddressedArgument(Argument):
 
-    def value(self, computer: 'IntCodeComputer') -> int:
-        return computer.memory[self.address_index]
+# number of memory cells taken by each instruction including the opcode
+INSTRUCTION_LENGTHS = {1: 4, 2: 4, 3: 2, 4: 2, 5: 3, 6: 3, 7: 4, 8: 4, 9: 2,
+                       99: 1}
 
-    def address(self, computer: 'IntCodeComputer'):
-        return self.address_index
+POSITION_MODE = 0
+IMMEDIATE_MODE = 1
+RELATIVE_MODE = 2
 
 
-class RelativeAddressedArgument(Argument):
+def decode(word: int) -> Instruction:
+    """Decodes an opcode word into its opcode, parameter modes and length."""
+    opcode = word % 100
+    if opcode not in INSTRUCTION_LENGTHS:
+        raise ValueError("Unknown operand", word)
 
-    def value(self, computer: 'IntCodeComputer') -> int:
-        return computer.memory[self.address_index + computer.rb]
+    modes = (word // 100 % 10, word // 1000 % 10, word // 10000 % 10)
+    for mode in modes:
+        if mode > RELATIVE_MODE:
+            raise ValueError("Unknown argument type", word)
 
-    def address(self, computer: 'IntCodeComputer'):
-        return self.address_index + computer.rb
+    return Instruction(opcode, modes, INSTRUCTION_LENGTHS[opcode])
 
 
 class RandomAccessMemory(object):
@@ -73,150 +88,575 @@ class RandomAccessMemory(object):
     def __setitem__(self, key: int, value: int):
         self.memory[key] = value
 
+    def footprint(self) -> int:
+        """Approximate number of bytes held by the memory cells."""
+        return sys.getsizeof(self.memory) \
+            + sum(sys.getsizeof(value) for value in self.memory.values())
+
+    def snapshot(self) -> Dict[int, int]:
+        return dict(self.memory)
+
+    def restore(self, state: Dict[int, int]):
+        self.memory = dict(state)
+
+
+class FlatRandomAccessMemory(object):
+    """A RAM for the IntComputer backed by a contiguous list
+
+    The list holds the program image and grows on demand while writes stay
+    within `growth_window` cells of its end. Addresses further away (and
+    negative ones) go to a sparse overflow dictionary instead."""
+    cells: List[int]
+    overflow: Dict[int, int]
+    growth_window: int
+    uninitialized_memory_value: int
+
+    def __init__(self, program_sequence: List[int], growth_window: int = 4096):
+        self.uninitialized_memory_value = 0
+
+        self.cells = list(program_sequence)
+        self.overflow = {}
+        self.growth_window = growth_window
+
+    def __getitem__(self, key: int) -> int:
+        if 0 <= key < len(self.cells):
+            return self.cells[key]
+        return self.overflow.get(key, self.uninitialized_memory_value)
+
+    def __setitem__(self, key: int, value: int):
+        if 0 <= key < len(self.cells):
+            self.cells[key] = value
+        elif len(self.cells) <= key < len(self.cells) + self.growth_window:
+            self._grow(key + 1)
+            self.cells[key] = value
+        else:
+            self.overflow[key] = value
+
+    def _grow(self, size: int):
+        begin = len(self.cells)
+        self.cells.extend([self.uninitialized_memory_value] * (size - begin))
+
+        # move overflowed cells which are now part of the contiguous region
+        for address in [a for a in self.overflow if begin <= a < size]:
+            self.cells[address] = self.overflow.pop(address)
+
+    def footprint(self) -> int:
+        """Approximate number of bytes held by the memory cells."""
+        return sys.getsizeof(self.cells) \
+            + sum(sys.getsizeof(value) for value in self.cells) \
+            + sys.getsizeof(self.overflow) \
+            + sum(sys.getsizeof(value) for value in self.overflow.values())
+
+    def snapshot(self) -> Tuple[List[int], Dict[int, int]]:
+        return list(self.cells), dict(self.overflow)
+
+    def restore(self, state: Tuple[List[int], Dict[int, int]]):
+        self.cells = list(state[0])
+        self.overflow = dict(state[1])
+
+
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+
+
+class PagedRandomAccessMemory(object):
+    """A RAM for the IntComputer split into copy-on-write pages
+
+    A snapshot only copies the page table. The pages themselves are shared
+    with the snapshot until the first write to them."""
+    pages: Dict[int, List[int]]
+    shared: Set[int]  # numbers of pages shared with a snapshot
+    uninitialized_memory_value: int
+
+    def __init__(self, program_sequence: List[int]):
+        self.uninitialized_memory_value = 0
+
+        self.pages = {}
+        self.shared = set()
+        for begin in range(0, len(program_sequence), PAGE_SIZE):
+            page = program_sequence[begin:begin + PAGE_SIZE]
+            page += [self.uninitialized_memory_value] * (PAGE_SIZE - len(page))
+            self.pages[begin >> PAGE_BITS] = page
+
+    def __getitem__(self, key: int) -> int:
+        page = self.pages.get(key >> PAGE_BITS)
+        if page is None:
+            return self.uninitialized_memory_value
+        return page[key & (PAGE_SIZE - 1)]
+
+    def __setitem__(self, key: int, value: int):
+        number = key >> PAGE_BITS
+        page = self.pages.get(number)
+        if page is None:
+            page = [self.uninitialized_memory_value] * PAGE_SIZE
+            self.pages[number] = page
+        elif number in self.shared:
+            page = list(page)
+            self.pages[number] = page
+            self.shared.discard(number)
+        page[key & (PAGE_SIZE - 1)] = value
+
+    def footprint(self) -> int:
+        """Approximate number of bytes held by the memory cells."""
+        return sys.getsizeof(self.pages) \
+            + sum(sys.getsizeof(page) + sum(map(sys.getsizeof, page))
+                  for page in self.pages.values())
+
+    def snapshot(self) -> Dict[int, List[int]]:
+        self.shared = set(self.pages)
+        return dict(self.pages)
+
+    def restore(self, state: Dict[int, List[int]]):
+        self.pages = dict(state)
+        self.shared = set(state)
+
+
+Memory = Union[RandomAccessMemory, FlatRandomAccessMemory,
+               PagedRandomAccessMemory]
+
+
+# the longest straight-line run of instructions compiled into one block
+MAX_BLOCK_LENGTH = 64
+
+
+class Block(NamedTuple):
+    """A compiled run of instructions"""
+    function: Callable[['IntCodeComputer'], None]
+    start: int  # address of the first instruction
+    cells: FrozenSet[int]  # memory cells baked into the compiled code
+
+
+def _parameter_source(address: int, memory: 'Memory',
+                      volatile: Set[int]) -> str:
+    """Volatile cells have been written by the program before, so they are
+    read at run time instead of being baked into the code."""
+    if address in volatile:
+        return "read({})".format(address)
+    return str(memory[address])
+
+
+def _value_source(mode: int, parameter: str) -> str:
+    if mode == IMMEDIATE_MODE:
+        return parameter
+    if mode == RELATIVE_MODE:
+        return "read(rb + {})".format(parameter)
+    return "read({})".format(parameter)
+
+
+def _address_source(mode: int, parameter: str) -> str:
+    if mode == RELATIVE_MODE:
+        return "rb + {}".format(parameter)
+    return parameter
+
+
+def _exit_source(pc: str, executed: int) -> List[str]:
+    return ["computer.rb = rb", "computer.pc = {}".format(pc),
+            "computer.cycles += {}".format(executed), "return"]
+
+
+def compile_block(memory: 'Memory', start: int,
+                  volatile: Set[int]) -> Optional[Block]:
+    """Compiles the instructions from `start` up to the next jump into
+    a Python function operating on an IntCodeComputer.
+
+    The block stops in front of input, output and halt instructions, and
+    in front of anything it cannot decode, which are all left to the
+    interpreter. Returns None when not even the first instruction at
+    `start` can be compiled.
+
+    Operands of non-volatile cells are baked into the generated code, so a
+    write to any of the block's cells leaves the block right away and the
+    computer drops it (see IntCodeComputer.write)."""
+    body = []
+    cells = set()
+    pc = start
+    executed = 0  # instructions compiled so far
+
+    def write_source(target: str, value: str, next_pc: int) -> List[str]:
+        # the block cells are only known at the end, so `cells` is a name
+        # bound to them in the generated code
+        return ["address = {}".format(target),
+                "write(address, {})".format(value),
+                "if address in cells:"] \
+            + ["    " + line
+               for line in _exit_source(str(next_pc), executed)]
+
+    for _ in range(MAX_BLOCK_LENGTH):
+        if pc in volatile:
+            break
+        try:
+            instruction = decode(memory[pc])
+        except ValueError:
+            break
+
+        operand = instruction.opcode
+        modes = instruction.modes
+        next_pc = pc + instruction.length
+
+        if operand in (3, 4, 99):
+            break
+        if operand in (1, 2, 7, 8) and modes[2] == IMMEDIATE_MODE:
+            break
+
+        executed += 1
+        parameters = [_parameter_source(pc + offset, memory, volatile)
+                      for offset in range(1, instruction.length)]
+        cells.update(address for address in range(pc, next_pc)
+                     if address not in volatile)
+
+        if operand in (1, 2, 7, 8):
+            in1 = _value_source(modes[0], parameters[0])
+            in2 = _value_source(modes[1], parameters[1])
+            out = _address_source(modes[2], parameters[2])
+            if operand == 1:
+                value = "{} + {}".format(in1, in2)
+            elif operand == 2:
+                value = "{} * {}".format(in1, in2)
+            elif operand == 7:
+                value = "1 if {} < {} else 0".format(in1, in2)
+            else:
+                value = "1 if {} == {} else 0".format(in1, in2)
+            body += write_source(out, value, next_pc)
+        elif operand == 9:
+            body.append("rb += {}".format(
+                _value_source(modes[0], parameters[0])))
+        elif operand in (5, 6):
+            condition = "!=" if operand == 5 else "=="
+            body.append("if {} {} 0:".format(
+                _value_source(modes[0], parameters[0]), condition))
+            body += ["    " + line for line in _exit_source(
+                _value_source(modes[1], parameters[1]), executed)]
+            body += _exit_source(str(next_pc), executed)
+            pc = next_pc
+            break
+
+        pc = next_pc
+
+    if pc == start:
+        return None
+    if body[-1] != "return":
+        body += _exit_source(str(pc), executed)
+
+    source = "\n".join(
+        ["def block(computer):",
+         "    read = computer.memory.__getitem__",
+         "    write = computer.write",
+         "    rb = computer.rb"]
+        + ["    " + line for line in body])
+    namespace = {"cells": frozenset(cells)}
+    exec(compile(source, "<intcode block {}>".format(start), "exec"),
+         namespace)
+    return Block(namespace["block"], start, namespace["cells"])
+
+
+class Status(IntEnum):
+    """Why IntCodeComputer.run_until_io returned"""
+    HALTED = 0
+    NEEDS_INPUT = 1
+    OUTPUT = 2
+
+
+class Snapshot(NamedTuple):
+    """Saved state of an IntCodeComputer"""
+    pc: int
+    rb: int
+    halt: bool
+    memory: object  # state saved by the memory backend
+    inputs: Tuple[int, ...]
+    outputs: Tuple[int, ...]
+
 
 class IntCodeComputer(object):
     pc: int  # the program counter register
     rb: int  # the relative base register
     halt: bool  # halting register
-    memory: RandomAccessMemory  # random access memory
+    cycles: int  # number of executed instructions
+    memory: Memory  # random access memory
     io: IO
-
-    def __init__(self, program_sequence: List[int], io: IO):
+    decoded: Dict[int, Instruction]  # decoded instructions by address
+    compiled: bool  # run compiled blocks instead of interpreting
+    blocks: Dict[int, Callable[['IntCodeComputer'], None]]  # by start
+    block_cells: Dict[int, Set[int]]  # starts of blocks covering a cell
+    volatile: Set[int]  # compiled cells which the program wrote to
+    inputs: Deque[int]  # values waiting for run_until_io
+    outputs: List[int]  # produced values not yet passed to the IO
+    recorder: Optional[TranscriptWriter]  # records the IO when set
+
+    def __init__(self, program_sequence: List[int], io: IO,
+                 memory_type: Type[Memory] = RandomAccessMemory,
+                 compiled: bool = True):
         self.pc = 0
         self.rb = 0
         self.halt = False
+        self.cycles = 0
 
-        self.memory = RandomAccessMemory(program_sequence)
+        self.memory = memory_type(program_sequence)
         self.io = io
-
-    @staticmethod
-    def create_argument(state: str, address: int):
-        if state == "0":
-            return AddressedArgument(address=address)
-        elif state == "1":
-            return ImmediateArgument(address=address)
-        elif state == "2":
-            return RelativeAddressedArgument(address=address)
+        self.decoded = {}
+        self.compiled = compiled
+        self.blocks = {}
+        self.block_cells = {}
+        self.volatile = set()
+        self.inputs = deque()
+        self.outputs = []
+        self.recorder = None
+
+    def run(self, profiler: Optional[Profiler] = None):
+        """Runs until the program halts. A profiler turns on the
+        (much slower) profiled interpreter."""
+        if profiler is not None:
+            self.run_profiled(profiler)
+            return
+
+        if not self.compiled:
+            while not self.halt:
+                self.step()
         else:
-            raise ValueError("Unknown argument type")
-
-    def run(self):
+            blocks = self.blocks
+            while not self.halt:
+                block = blocks.get(self.pc)
+                if block is None:
+                    block = self.compile(self.pc)
+                block(self)
+        self.flush_outputs()
+
+    def run_profiled(self, profiler: Profiler):
+        io = self.io
+        self.io = ProfiledIO(io, profiler)
+        clock = time.perf_counter
+
+        block = self.pc
+        profiler.enter_block(block)
+        try:
+            while not self.halt:
+                pc = self.pc
+                instruction = self.fetch()
+                start = clock()
+                self.process_instruction(instruction)
+                profiler.record(pc, instruction.opcode, block, clock() - start)
+
+                # basic blocks begin at jump targets and after jumps
+                if instruction.opcode in (5, 6):
+                    block = self.pc
+                    profiler.enter_block(block)
+            self.flush_outputs()
+        finally:
+            self.io = io
+
+    def run_until_io(self, stop_on_output: bool = True) -> Status:
+        """Runs without the IO callbacks and suspends instead.
+
+        Inputs are taken from `inputs` (see send_input) and the computer
+        returns NEEDS_INPUT when there are none left. Outputs are appended
+        to `outputs` and the computer returns OUTPUT after each of them
+        unless `stop_on_output` is False. Calling it again resumes."""
         while not self.halt:
-            instruction = self.memory[self.pc]
-            self.process_instruction(instruction)
-
-    def hard_set_memory_cell(self, address: int, value: int):
-        self.memory[address] = value
+            instruction = self.fetch()
+            if instruction.opcode == 3:
+                if not self.inputs:
+                    return Status.NEEDS_INPUT
+                self.cycles += 1
+                self.store_input(instruction.modes, self.inputs.popleft())
+            elif instruction.opcode == 4:
+                self.cycles += 1
+                self.store_output(instruction.modes)
+                if stop_on_output:
+                    return Status.OUTPUT
+            elif self.compiled:
+                block = self.blocks.get(self.pc)
+                if block is None:
+                    block = self.compile(self.pc)
+                block(self)
+            else:
+                self.process_instruction(instruction)
+        return Status.HALTED
+
+    def send_input(self, *values: int):
+        """Queues input values for run_until_io."""
+        self.inputs.extend(values)
+
+    def snapshot(self) -> Snapshot:
+        """Saves the registers, memory and pending IO values. This is cheap
+        with PagedRandomAccessMemory which shares pages until written."""
+        return Snapshot(self.pc, self.rb, self.halt, self.memory.snapshot(),
+                        tuple(self.inputs), tuple(self.outputs))
+
+    def restore(self, snapshot: Snapshot):
+        """Returns to a saved state. The decoded instructions and compiled
+        blocks are dropped as they may not match the restored memory."""
+        self.pc = snapshot.pc
+        self.rb = snapshot.rb
+        self.halt = snapshot.halt
+        self.memory.restore(snapshot.memory)
+        self.inputs = deque(snapshot.inputs)
+        self.outputs = list(snapshot.outputs)
+
+        self.decoded = {}
+        self.blocks = {}
+        self.block_cells = {}
+        self.volatile = set()
+
+    def fork(self, io: Optional[IO] = None) -> 'IntCodeComputer':
+        """Creates a computer continuing from the current state. It uses
+        the same IO unless another one is given."""
+        computer = IntCodeComputer([], io if io is not None else self.io,
+                                   type(self.memory), self.compiled)
+        computer.restore(self.snapshot())
+        return computer
+
+    def drain_outputs(self) -> List[int]:
+        """Takes all pending output values without copying them."""
+        outputs = self.outputs
+        self.outputs = []
+        return outputs
+
+    def flush_outputs(self):
+        """Hands the pending outputs to the IO as a last, short chunk."""
+        if self.outputs:
+            self.io.output_chunk(self.drain_outputs())
+
+    def step(self):
+        """Interprets a single instruction."""
+        self.process_instruction(self.fetch())
+
+    def compile(self, start: int) -> Callable[['IntCodeComputer'], None]:
+        """Compiles and caches the block at `start`. Falls back to a single
+        interpreted step where nothing can be compiled."""
+        block = compile_block(self.memory, start, self.volatile)
+        if block is None:
+            function, cells = IntCodeComputer.step, [start]
+        else:
+            function, cells = block.function, block.cells
 
-    def process_instruction(self, instruction: int):
-        instruction = str(instruction)
+        self.blocks[start] = function
+        for address in cells:
+            self.block_cells.setdefault(address, set()).add(start)
+        return function
 
-        operand = int(instruction[-2:])
+    def hard_set_memory_cell(self, address: int, value: int):
+        self.write(address, value)
 
-        # take leading chars up to operand and reverse it and append zeroes
-        states = instruction[:-2]
-        states = states[::-1] + "000000000000000"
+    def write(self, address: int, value: int):
+        """Writes to the memory and drops the decoded instruction and
+        compiled blocks at the address (the program may modify itself)."""
+        self.memory[address] = value
+        self.decoded.pop(address, None)
+        if address in self.block_cells:
+            self.volatile.add(address)
+            for start in self.block_cells.pop(address):
+                self.blocks.pop(start, None)
+
+    def fetch(self) -> Instruction:
+        """Returns the decoded instruction at the program counter."""
+        instruction = self.decoded.get(self.pc)
+        if instruction is None:
+            instruction = decode(self.memory[self.pc])
+            self.decoded[self.pc] = instruction
+        return instruction
+
+    def value(self, mode: int, offset: int) -> int:
+        """Reads the value of the parameter at pc + offset."""
+        parameter = self.memory[self.pc + offset]
+        if mode == IMMEDIATE_MODE:
+            return parameter
+        if mode == RELATIVE_MODE:
+            return self.memory[parameter + self.rb]
+        return self.memory[parameter]
+
+    def address(self, mode: int, offset: int) -> int:
+        """Resolves the address the parameter at pc + offset points to."""
+        parameter = self.memory[self.pc + offset]
+        if mode == RELATIVE_MODE:
+            return parameter + self.rb
+        if mode == IMMEDIATE_MODE:
+            raise ValueError("Immeadiate argument should not do this")
+        return parameter
+
+    def process_instruction(self, instruction: Instruction):
+        operand = instruction.opcode
+        modes = instruction.modes
+        self.cycles += 1
 
-        if operand == 99:
-            self.halt = True
         if operand == 1:
-            in1 = self.create_argument(states[0],
-                                       self.memory[self.pc + 1])
-            in2 = self.create_argument(states[1],
-                                       self.memory[self.pc + 2])
-            out = self.create_argument(states[2],
-                                       self.memory[self.pc + 3])
-            self.instruction_add(in1, in2, out)
-        if operand == 2:
-            in1 = self.create_argument(states[0],
-                                       self.memory[self.pc + 1])
-            in2 = self.create_argument(states[1],
-                                       self.memory[self.pc + 2])
-            out = self.create_argument(states[2],
-                                       self.memory[self.pc + 3])
-            self.instruction_multiply(in1, in2, out)
-        if operand == 3:
-            out = self.create_argument(states[0], self.memory[self.pc + 1])
-            self.instruction_input(out)
-        if operand == 4:
-            in1 = self.create_argument(states[0], self.memory[self.pc + 1])
-            self.instruction_output(in1)
-        if operand == 5:
-            in1 = self.create_argument(states[0], self.memory[self.pc + 1])
-            in2 = self.create_argument(states[1], self.memory[self.pc + 2])
-            self.instruction_jump_if_true(in1, in2)
-        if operand == 6:
-            in1 = self.create_argument(states[0], self.memory[self.pc + 1])
-            in2 = self.create_argument(states[1], self.memory[self.pc + 2])
-            self.instruction_jump_if_false(in1, in2)
-        if operand == 7:
-            in1 = self.create_argument(states[0],
-                                       self.memory[self.pc + 1])
-            in2 = self.create_argument(states[1],
-                                       self.memory[self.pc + 2])
-            out = self.create_argument(states[2],
-                                       self.memory[self.pc + 3])
-            self.instruction_less_than(in1, in2, out)
-        if operand == 8:
-            in1 = self.create_argument(states[0],
-                                       self.memory[self.pc + 1])
-            in2 = self.create_argument(states[1],
-                                       self.memory[self.pc + 2])
-            out = self.create_argument(states[2],
-                                       self.memory[self.pc + 3])
-            self.instruction_equals(in1, in2, out)
-        if operand == 9:
-            in1 = self.create_argument(states[0],
-                                       self.memory[self.pc + 1])
-            self.instruction_adjust_rb(in1)
-
-    def instruction_add(self, in1: Argument, in2: Argument, out: Argument):
-        self.memory[out.address(self)] = in1.value(self) + in2.value(self)
+            self.instruction_add(modes)
+        elif operand == 2:
+            self.instruction_multiply(modes)
+        elif operand == 3:
+            self.instruction_input(modes)
+        elif operand == 4:
+            self.instruction_output(modes)
+        elif operand == 5:
+            self.instruction_jump_if_true(modes)
+        elif operand == 6:
+            self.instruction_jump_if_false(modes)
+        elif operand == 7:
+            self.instruction_less_than(modes)
+        elif operand == 8:
+            self.instruction_equals(modes)
+        elif operand == 9:
+            self.instruction_adjust_rb(modes)
+        elif operand == 99:
+            self.halt = True
+
+    def instruction_add(self, modes: Tuple[int, int, int]):
+        self.write(self.address(modes[2], 3),
+                   self.value(modes[0], 1) + self.value(modes[1], 2))
         self.pc += 4
 
-    def instruction_multiply(self, in1: Argument, in2: Argument,
-                             out: Argument):
-        self.memory[out.address(self)] = in1.value(self) * in2.value(self)
+    def instruction_multiply(self, modes: Tuple[int, int, int]):
+        self.write(self.address(modes[2], 3),
+                   self.value(modes[0], 1) * self.value(modes[1], 2))
         self.pc += 4
 
-    def instruction_input(self, out: Argument):
-        input_value = int(self.io.input())
-        self.memory[out.address(self)] = input_value
+    def instruction_input(self, modes: Tuple[int, int, int]):
+        self.store_input(modes, int(self.io.input()))
+
+    def instruction_output(self, modes: Tuple[int, int, int]):
+        self.store_output(modes)
+        if len(self.outputs) >= self.io.chunk_size:
+            self.io.output_chunk(self.drain_outputs())
+
+    def store_input(self, modes: Tuple[int, int, int], value: int):
+        if self.recorder is not None:
+            self.recorder.record(INPUT, self.cycles, value)
+        self.write(self.address(modes[0], 1), value)
         self.pc += 2
 
-    def instruction_output(self, in1: Argument):
-        self.io.output(str(in1.value(self)))
+    def store_output(self, modes: Tuple[int, int, int]):
+        value = self.value(modes[0], 1)
+        if self.recorder is not None:
+            self.recorder.record(OUTPUT, self.cycles, value)
+        self.outputs.append(value)
         self.pc += 2
 
-    def instruction_jump_if_true(self, in1: Argument, in2: Argument):
-        if in1.value(self) != 0:
-            self.pc = in2.value(self)
+    def instruction_jump_if_true(self, modes: Tuple[int, int, int]):
+        if self.value(modes[0], 1) != 0:
+            self.pc = self.value(modes[1], 2)
         else:
             self.pc += 3
 
-    def instruction_jump_if_false(self, in1: Argument, in2: Argument):
-        if in1.value(self) == 0:
-            self.pc = in2.value(self)
+    def instruction_jump_if_false(self, modes: Tuple[int, int, int]):
+        if self.value(modes[0], 1) == 0:
+            self.pc = self.value(modes[1], 2)
         else:
             self.pc += 3
 
-    def instruction_less_than(self, in1: Argument, in2: Argument,
-                              out: Argument):
-        if in1.value(self) < in2.value(self):
-            self.memory[out.address(self)] = 1
+    def instruction_less_than(self, modes: Tuple[int, int, int]):
+        if self.value(modes[0], 1) < self.value(modes[1], 2):
+            self.write(self.address(modes[2], 3), 1)
         else:
-            self.memory[out.address(self)] = 0
+            self.write(self.address(modes[2], 3), 0)
         self.pc += 4
 
-    def instruction_equals(self, in1: Argument, in2: Argument, out: Argument):
-        if in1.value(self) == in2.value(self):
-            self.memory[out.address(self)] = 1
+    def instruction_equals(self, modes: Tuple[int, int, int]):
+        if self.value(modes[0], 1) == self.value(modes[1], 2):
+            self.write(self.address(modes[2], 3), 1)
         else:
-            self.memory[out.address(self)] = 0
+            self.write(self.address(modes[2], 3), 0)
         self.pc += 4
 
-    def instruction_adjust_rb(self, in1: Argument):
-        self.rb += in1.value(self)
+    def instruction_adjust_rb(self, modes: Tuple[int, int, int]):
+        self.rb += self.value(modes[0], 1)
         self.pc += 2
 
 
@@ -228,7 +668,7 @@ def scan_program_from_input() -> List[int]:
 
 def main():
     program_sequence = scan_program_from_input()
-    computer = IntCodeComputer(program_sequence, None)
+    computer = IntCodeComputer(program_sequence, ConsoleIO())
     computer.run()
 
 
@@ -1,22 +1,88 @@
-import fileinput
+import sys
+from typing import BinaryIO, Iterator, List
+
+try:
+    import numpy
+except ImportError:  # the bulk functions fall back to plain Python
+    numpy = None
+
+# bytes of the manifest read at once by the bulk functions
+CHUNK_SIZE = 1 << 20
 
 
 def calculate_fuel(mass: int) -> int:
     return (mass // 3) - 2
 
 
-if __name__ == "__main__":
-    total_fuel_requirement = 0
+def calculate_total_fuel(mass: int) -> int:
+    """Fuel for the module and for the fuel itself."""
+    total = 0
+    fuel = calculate_fuel(mass)
+    while fuel > 0:
+        total += fuel
+        fuel = calculate_fuel(fuel)
+    return total
+
+
+def total_fuel_of_masses(masses) -> int:
+    """Total recursive fuel of a sequence or NumPy array of masses.
+
+    Each round computes the fuel of the whole array at once, so there are
+    only about log3 of the biggest mass rounds."""
+    if numpy is None:
+        return sum(calculate_total_fuel(mass) for mass in masses)
+
+    fuel = numpy.asarray(masses, dtype=numpy.int64)
+    total = 0
+    while fuel.size:
+        fuel = fuel // 3 - 2
+        fuel = fuel[fuel > 0]
+        total += int(fuel.sum())
+    return total
+
 
-    for line in fileinput.input():
-        module_mass = int(line)
+def read_mass_chunks(manifest: BinaryIO,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[List[int]]:
+    """Reads whitespace separated masses in chunks of about `chunk_size`
+    bytes, as NumPy arrays when NumPy is available."""
+    rest = b""
+    while True:
+        data = manifest.read(chunk_size)
+        if not data:
+            break
 
-        fuel_requirements = []
-        fuel_requirement = calculate_fuel(module_mass)
-        while fuel_requirement > 0:
-            fuel_requirements.append(fuel_requirement)
-            fuel_requirement = calculate_fuel(fuel_requirement)
+        # a number may continue in the next chunk
+        data = rest + data
+        end = max(data.rfind(b"\n"), data.rfind(b" ")) + 1
+        rest = data[end:]
+        if end:
+            yield _parse_masses(data[:end])
+
+    if rest.strip():
+        yield _parse_masses(rest)
+
+
+def _parse_masses(data: bytes):
+    if numpy is None:
+        return [int(x) for x in data.split()]
+    return numpy.array(data.split(), dtype=numpy.int64)
+
+
+def manifest_fuel(manifest: BinaryIO, chunk_size: int = CHUNK_SIZE) -> int:
+    """Total recursive fuel of a manifest streamed chunk by chunk, so only
+    one chunk of masses is held in memory."""
+    return sum(total_fuel_of_masses(masses)
+               for masses in read_mass_chunks(manifest, chunk_size))
+
+
+if __name__ == "__main__":
+    total_fuel_requirement = 0
 
-        total_fuel_requirement += sum(fuel_requirements)
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            with open(path, "rb") as manifest:
+                total_fuel_requirement += manifest_fuel(manifest)
+    else:
+        total_fuel_requirement = manifest_fuel(sys.stdin.buffer)
 
     print(total_fuel_requirement)
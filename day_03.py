@@ -1,124 +1,154 @@
-from typing import List, Tuple, NamedTuple
-
-
-class Position(NamedTuple):
-    x: int
-    y: int
+import bisect
+from collections import defaultdict
+from typing import List, NamedTuple, Iterator, Dict, Optional
+
+
+class Segment(NamedTuple):
+    """A straight part of a wire, `steps` is the wire length up to its
+    start (x1, y1)."""
+    x1: int
+    y1: int
+    x2: int
+    y2: int
     steps: int
 
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-    def __eq__(self, other):
-        if self.x == other.x and self.y == other.y:
-            return True
-        return False
-
-
-def trace_line(source: Position, destination: Position) -> List[Position]:
-    """Excludes the source position."""
-    traced_positions = []
-
-    if source.x == destination.x:
-        step_direction = 1
-        if source.y > destination.y:
-            step_direction = -1
-
-        t = 1
-        for i in range(source.y + step_direction,
-                       destination.y + step_direction,
-                       step_direction):
-            traced_positions.append(Position(x=source.x, y=i,
-                                             steps=source.steps + t))
-            t += 1
-
-    elif source.y == destination.y:
-        step_direction = 1
-        if source.x > destination.x:
-            step_direction = -1
-
-        t = 1
-        for i in range(source.x + step_direction,
-                       destination.x + step_direction,
-                       step_direction):
-            traced_positions.append(Position(x=i, y=source.y,
-                                             steps=source.steps + t))
-            t += 1
-
-    else:
-        raise ValueError("Not a straight line")
+    def horizontal(self) -> bool:
+        return self.y1 == self.y2
 
-    return traced_positions
+    def steps_to(self, x: int, y: int) -> int:
+        return self.steps + abs(x - self.x1) + abs(y - self.y1)
 
 
-def trace_poly_line(positions: List[Position]) -> List[Position]:
-    traced_positions = []
-    current = positions[0]
-
-    for position in positions:
-        traced_positions += trace_line(current, position)
-        current = position
+class Crossing(NamedTuple):
+    x: int
+    y: int
+    steps: int  # combined steps of both wires
 
-    return traced_positions
 
+DIRECTIONS = {"R": (1, 0), "L": (-1, 0), "U": (0, 1), "D": (0, -1)}
 
-def trace_commands(command_sequence: List[str]) -> List[Position]:
-    current_position = Position(x=0, y=0, steps=0)
 
-    all_positions = [current_position]
+def trace_commands(command_sequence: List[str]) -> List[Segment]:
+    segments = []
+    x = y = steps = 0
 
     for command in command_sequence:
-        direction = command[0]
+        dx, dy = DIRECTIONS[command[0]]
         step_size = int(command[1:])
-        if direction == "R":
-            current_position = Position(x=current_position.x + step_size,
-                                        y=current_position.y,
-                                        steps=current_position.steps + step_size)
-        elif direction == "L":
-            current_position = Position(x=current_position.x - step_size,
-                                        y=current_position.y,
-                                        steps=current_position.steps + step_size)
-        elif direction == "U":
-            current_position = Position(x=current_position.x,
-                                        y=current_position.y + step_size,
-                                        steps=current_position.steps + step_size)
-        elif direction == "D":
-            current_position = Position(x=current_position.x,
-                                        y=current_position.y - step_size,
-                                        steps=current_position.steps + step_size)
-        all_positions.append(current_position)
-
-    return trace_poly_line(all_positions)
-
-
-def distance(pos: Position) -> int:
-    return abs(pos.x) + abs(pos.y)
+        segments.append(Segment(x, y, x + dx * step_size, y + dy * step_size,
+                                steps))
+        x += dx * step_size
+        y += dy * step_size
+        steps += step_size
+
+    return segments
+
+
+def _perpendicular_crossings(horizontals: List[Segment],
+                             verticals: List[Segment]) -> Iterator[Crossing]:
+    """Sweeps from left to right keeping the horizontal segments under the
+    sweep line sorted by y, each vertical segment looks up its y range."""
+    events = []
+    for index, segment in enumerate(horizontals):
+        events.append((min(segment.x1, segment.x2), 0, index))
+        events.append((max(segment.x1, segment.x2), 2, index))
+    for index, segment in enumerate(verticals):
+        events.append((segment.x1, 1, index))
+    events.sort()
+
+    active = []  # (y, index) of the horizontal segments under the sweep line
+    for x, kind, index in events:
+        if kind == 0:
+            bisect.insort(active, (horizontals[index].y1, index))
+        elif kind == 2:
+            del active[bisect.bisect_left(active,
+                                          (horizontals[index].y1, index))]
+        else:
+            vertical = verticals[index]
+            low = min(vertical.y1, vertical.y2)
+            high = max(vertical.y1, vertical.y2)
+            for y, other in active[bisect.bisect_left(active, (low,)):
+                                   bisect.bisect_left(active, (high + 1,))]:
+                yield Crossing(x, y, vertical.steps_to(x, y)
+                               + horizontals[other].steps_to(x, y))
+
+
+def _overlap_crossings(first: List[Segment],
+                       second: List[Segment]) -> Iterator[Crossing]:
+    """Crossings of segments lying on the same line. Only the ends of an
+    overlap and its points closest to the origin are produced, the
+    distance and the step count are smallest at one of them."""
+    lines: Dict[tuple, List[Segment]] = defaultdict(list)
+    for segment in first:
+        if segment.horizontal():
+            lines["y", segment.y1].append(segment)
+        if segment.x1 == segment.x2:
+            lines["x", segment.x1].append(segment)
+
+    for segment in second:
+        candidates = []
+        if segment.horizontal():
+            candidates += [("y", other) for other in lines["y", segment.y1]]
+        if segment.x1 == segment.x2:
+            candidates += [("x", other) for other in lines["x", segment.x1]]
+
+        for axis, other in candidates:
+            if axis == "y":
+                start, end, fixed = segment.x1, segment.x2, segment.y1
+                other_start, other_end = other.x1, other.x2
+            else:
+                start, end, fixed = segment.y1, segment.y2, segment.x1
+                other_start, other_end = other.y1, other.y2
+
+            low = max(min(start, end), min(other_start, other_end))
+            high = min(max(start, end), max(other_start, other_end))
+            if low > high:
+                continue
+
+            # the origin itself is skipped, so its neighbours are kept too
+            positions = {low, high}
+            positions.update(min(max(p, low), high) for p in (-1, 0, 1))
+            for position in positions:
+                x, y = (position, fixed) if axis == "y" else (fixed, position)
+                yield Crossing(x, y, segment.steps_to(x, y)
+                               + other.steps_to(x, y))
+
+
+def crossings(first: List[Segment],
+              second: List[Segment]) -> Iterator[Crossing]:
+    """Points where the wires cross, except the origin they both start at.
+    A point appears once for every pair of segments crossing at it."""
+    first_horizontals = [s for s in first if s.horizontal()]
+    first_verticals = [s for s in first if not s.horizontal()]
+    second_horizontals = [s for s in second if s.horizontal()]
+    second_verticals = [s for s in second if not s.horizontal()]
+
+    found = [_perpendicular_crossings(first_horizontals, second_verticals),
+             _perpendicular_crossings(second_horizontals, first_verticals),
+             _overlap_crossings(first, second)]
+    for crossings_found in found:
+        for crossing in crossings_found:
+            if crossing.x != 0 or crossing.y != 0:
+                yield crossing
+
+
+def distance(crossing: Crossing) -> int:
+    return abs(crossing.x) + abs(crossing.y)
+
+
+def closest_crossing_distance(first: List[Segment],
+                              second: List[Segment]) -> Optional[int]:
+    return min(map(distance, crossings(first, second)), default=None)
+
+
+def fewest_combined_steps(first: List[Segment],
+                          second: List[Segment]) -> Optional[int]:
+    return min((crossing.steps for crossing in crossings(first, second)),
+               default=None)
 
 
 if __name__ == "__main__":
-    input_string = input()
-    first_commands = input_string.split(",")
-    first_trace = trace_commands(first_commands)
-    first_trace_set = set(first_trace)
-
-    first_dict = {pos: pos.steps for pos in first_trace_set}
-
-    input_string = input()
-    second_commands = input_string.split(",")
-    second_trace = trace_commands(second_commands)
-
-    second_trace_set = set(second_trace)
-
-    second_dict = {pos: pos.steps for pos in second_trace_set}
-
-    intersection = first_trace_set.intersection(second_trace_set)
-
-    minimal_number_of_steps = len(first_trace) + len(second_trace)
-
-    for position in intersection:
-        step_sum = first_dict[position] + second_dict[position]
-        if step_sum < minimal_number_of_steps:
-            minimal_number_of_steps = step_sum
-
-    print(minimal_number_of_steps)
+    first_trace = trace_commands(input().split(","))
+    second_trace = trace_commands(input().split(","))
 
+    print(fewest_combined_steps(first_trace, second_trace))
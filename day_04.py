@@ -1,4 +1,6 @@
-from typing import List, Tuple, NamedTuple
+from collections import Counter
+from itertools import combinations_with_replacement
+from typing import List, Tuple, NamedTuple, Iterator
 
 
 def is_six_digit(digits: str):
@@ -37,19 +39,42 @@ def has_exactly_one_double_digit(digits: str):
     return False
 
 
+def non_decreasing_numbers(low: int, high: int) -> Iterator[str]:
+    """Numbers in the range [low, high] with non-decreasing digits, in
+    ascending order. They are built as digit combinations, so the numbers
+    in between are never looked at."""
+    for length in range(len(str(low)), len(str(high)) + 1):
+        # no leading zeros, so only a single digit number may contain a 0
+        digits = "0123456789" if length == 1 else "123456789"
+        for combination in combinations_with_replacement(digits, length):
+            number = int("".join(combination))
+            if number > high:
+                return
+            if number >= low:
+                yield "".join(combination)
+
+
+def count_passwords(low: int, high: int) -> Tuple[int, int]:
+    """Numbers in the range with non-decreasing digits which have two
+    adjacent same digits, and which have exactly one double digit."""
+    adjacent_pair = 0
+    exactly_one_double = 0
+    for digits in non_decreasing_numbers(low, high):
+        # with sorted digits the same digits are always adjacent
+        group_sizes = Counter(digits).values()
+        if len(group_sizes) < len(digits):
+            adjacent_pair += 1
+            if 2 in group_sizes:
+                exactly_one_double += 1
+    return adjacent_pair, exactly_one_double
+
+
 if __name__ == "__main__":
     number_of_possible_passwords = 0
-    for number in range(240920, 789857 + 1, 1):
-        str_representation = str(number)
-
+    for str_representation in non_decreasing_numbers(240920, 789857):
         if has_two_adjacent_same_digits(str_representation) \
-                and has_increasing_digits_only(str_representation)\
                 and has_exactly_one_double_digit(str_representation):
-            print(number)
+            print(str_representation)
             number_of_possible_passwords += 1
 
     print("number of passwords: {}".format(number_of_possible_passwords))
-
-
-
-
@@ -1,61 +1,98 @@
+from array import array
 from typing import Dict, List
 
 
-def bfs(start: str, end: str, graph: Dict[str, List[str]]) -> int:
-    queue: List[str] = [start]
-
-    visited = set()
-
-    distances = {}
-    for node in graph.keys():
-        distances[node] = 0
-
-    while queue:
-        current = queue.pop(0)
-
-        for child in graph[current]:
-
-            if child not in visited:
-                visited.add(child)
-                queue.append(child)
-                distances[child] = distances[current] + 1
-
-                if child == end:
-                    return distances[end]
-
-    raise ValueError("End not found")
-
-
-def count_orbits_for_planet(node: str, graph: Dict[str, List[str]]) -> int:
-    stack: List[str] = [node]
-    visited = set()
-
-    orbits = 0
-
-    while stack:
-        current = stack.pop()
-
-        for child in graph[current]:
-
-            # if child not in visited:
-            orbits += 1
-            stack.append(child)
-
-    return orbits
-
-
-def count_orbits(graph: Dict[str, List[str]]) -> int:
-
-    total_number_of_orbits = 0
-
-    for node in graph.keys():
-        total_number_of_orbits += count_orbits_for_planet(node, graph)
-
-    return total_number_of_orbits
+class OrbitIndex(object):
+    """Depths and ancestors of all bodies, built once from the map of the
+    body each body orbits
+
+    Bodies are numbered and every table is an array indexed by that number.
+    `ancestors[k][i]` is the body 2^k levels above body i (the root stays
+    the root), which answers common ancestor queries in O(log n)."""
+    ids: Dict[str, int]
+    names: List[str]
+    parents: array
+    depths: array  # number of direct and indirect orbits of a body
+    ancestors: List[array]
+
+    def __init__(self, orbits: Dict[str, str]):
+        self.ids = {}
+        for child, parent in orbits.items():
+            self.ids.setdefault(parent, len(self.ids))
+            self.ids.setdefault(child, len(self.ids))
+        self.names = list(self.ids)
+
+        self.parents = array("q", range(len(self.ids)))
+        for child, parent in orbits.items():
+            self.parents[self.ids[child]] = self.ids[parent]
+
+        self.depths = self._compute_depths()
+
+        self.ancestors = [self.parents]
+        for _ in range(max(self.depths, default=0).bit_length() - 1):
+            previous = self.ancestors[-1]
+            self.ancestors.append(array("q", (previous[up]
+                                              for up in previous)))
+
+    def _compute_depths(self) -> array:
+        depths = array("q", [-1]) * len(self.parents)
+        for body in range(len(self.parents)):
+            # climb to a body of known depth, then fill in the path down
+            path = []
+            while depths[body] < 0 and self.parents[body] != body:
+                path.append(body)
+                body = self.parents[body]
+            depth = max(depths[body], 0)
+            depths[body] = depth
+            for body in reversed(path):
+                depth += 1
+                depths[body] = depth
+        return depths
+
+    def total_orbits(self) -> int:
+        return sum(self.depths)
+
+    def depth(self, name: str) -> int:
+        return self.depths[self.ids[name]]
+
+    def _climb(self, body: int, levels: int) -> int:
+        k = 0
+        while levels:
+            if levels & 1:
+                body = self.ancestors[k][body]
+            levels >>= 1
+            k += 1
+        return body
+
+    def _common_ancestor(self, a: int, b: int) -> int:
+        if self.depths[a] < self.depths[b]:
+            a, b = b, a
+        a = self._climb(a, self.depths[a] - self.depths[b])
+        if a == b:
+            return a
+
+        for table in reversed(self.ancestors):
+            if table[a] != table[b]:
+                a, b = table[a], table[b]
+        return self.parents[a]
+
+    def common_ancestor(self, first: str, second: str) -> str:
+        return self.names[self._common_ancestor(self.ids[first],
+                                                self.ids[second])]
+
+    def distance(self, first: str, second: str) -> int:
+        """Number of orbit edges between two bodies."""
+        a, b = self.ids[first], self.ids[second]
+        ancestor = self._common_ancestor(a, b)
+        return self.depths[a] + self.depths[b] - 2 * self.depths[ancestor]
+
+    def orbital_transfers(self, first: str, second: str) -> int:
+        """Transfers between the bodies `first` and `second` orbit."""
+        return self.distance(first, second) - 2
 
 
 def main():
-    graph = {}
+    orbits = {}
 
     while True:
         input_string = input()
@@ -63,23 +100,12 @@ def main():
         if input_string == "":
             break
 
-        input_list = input_string.split(")")
-
-        parent = input_list[0]
-        child = input_list[1]
-
-        if child not in graph:
-            graph[child] = []
-        if parent not in graph:
-            graph[parent] = []
-
-        # make undirected edge
-        graph[parent].append(child)
-        graph[child].append(parent)
+        parent, child = input_string.split(")")
+        orbits[child] = parent
 
-    number_of_jumps = bfs("YOU", "SAN", graph) - 2
+    index = OrbitIndex(orbits)
 
-    print(number_of_jumps)
+    print(index.orbital_transfers("YOU", "SAN"))
 
 
 if __name__ == "__main__":
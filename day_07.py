@@ -1,224 +1,64 @@
-import fileinput
-from enum import IntEnum
-from typing import List, NamedTuple
+import asyncio
 import itertools
+from typing import List, Tuple
 
+from computer import IntCodeComputer
+from network import Network
+from search import search
 
-class CustomIO(object):
-    io_queue: List[str]
-    stdin: List[str]
-    stdout: List[str]
 
-    def __init__(self):
-        self.io_queue = []
-        self.stdin = []
-        self.stdout = []
-
-    # def input(self) -> str:
-    #     if not self.io_queue:
-    #         return input()
-    #     return self.io_queue.pop(0)
-
-    def input(self) -> str:
-        return self.stdin.pop(0)
-
-    # def output(self, x: str):
-    #     self.io_queue.append(x)
-    #     print(x)
-
-    def output(self, x: str):
-        self.stdout.append(x)
-        print(x)
-
-
-class Argument(object):
-    address: int
-
-    def __init__(self, address: int):
-        self.address = address
-
-    def value(self, sequence: List[int]):
-        raise NotImplementedError
-
-
-class ImmediateArgument(Argument):
-
-    def value(self, sequence: List[int]):
-        return self.address
-
-
-class AddressedArgument(Argument):
-
-    def value(self, sequence: List[int]):
-        return sequence[self.address]
-
-
-def compute_add(sequence: List[int],
-                in1: Argument, in2: Argument, out: Argument) -> None:
-    sequence[out.address] = in1.value(sequence) + in2.value(sequence)
+def run_amplifiers(program_sequence: List[int],
+                   phases: Tuple[int, ...]) -> int:
+    """Runs the amplifiers in a chain and returns the final signal."""
+    signal = 0
 
+    for phase in phases:
+        amplifier = IntCodeComputer(program_sequence, None, compiled=False)
+        amplifier.send_input(phase, signal)
+        amplifier.run_until_io(stop_on_output=False)
+        signal = amplifier.outputs[-1]
 
-def compute_multiply(sequence: List[int],
-                     in1: Argument, in2: Argument, out: Argument) -> None:
-    sequence[out.address] = in1.value(sequence) * in2.value(sequence)
+    return signal
 
 
-def take_input(sequence: List[int], out: Argument, io: CustomIO):
-    input_value = int(io.input())
-    sequence[out.address] = input_value
+async def run_feedback_loop(program_sequence: List[int],
+                            phases: Tuple[int, ...]) -> int:
+    """Runs the amplifiers in a ring and returns the last signal of the
+    last amplifier."""
+    network = Network()
+    names = [chr(ord("A") + index) for index in range(len(phases))]
 
+    for name, phase in zip(names, phases):
+        network.add(name, IntCodeComputer(program_sequence, None), [phase])
+    network.computers[names[0]].send_input(0)
+    network.ring(names)
 
-def print_output(sequence: List[int], in1: Argument, io: CustomIO):
-    io.output(str(in1.value(sequence)))
+    last_outputs = await network.run()
+    return last_outputs[names[-1]]
 
 
-def jump_if_true(sequence: List[int], in1: Argument, in2: Argument,
-                 program_counter: int) -> int:
-    if in1.value(sequence) != 0:
-        return in2.value(sequence)
-    else:
-        return program_counter + 3
-
-
-def jump_if_false(sequence: List[int], in1: Argument, in2: Argument,
-                  program_counter: int) -> int:
-    if in1.value(sequence) == 0:
-        return in2.value(sequence)
-    else:
-        return program_counter + 3
-
-
-def less_than(sequence: List[int], in1: Argument, in2: Argument,
-              out: Argument):
-    if in1.value(sequence) < in2.value(sequence):
-        sequence[out.address] = 1
-    else:
-        sequence[out.address] = 0
-
-
-def equals(sequence: List[int], in1: Argument, in2: Argument, out: Argument):
-    if in1.value(sequence) == in2.value(sequence):
-        sequence[out.address] = 1
-    else:
-        sequence[out.address] = 0
-
-
-def create_argument(state, address):
-    if state == "0":
-        return AddressedArgument(address=address)
-    else:
-        return ImmediateArgument(address=address)
-
-
-def process_instructions(instruction_sequence: List[int], io: CustomIO):
-    # for index in range(0, len(instruction_sequence), 4):
-
-    program_counter = 0
-
-    while True:
-        instruction = str(instruction_sequence[program_counter])
-
-        operand = int(instruction[-2:])
-
-        # take leading chars up to operand and reverse it and append zeroes
-        states = instruction[:-2]
-        states = states[::-1] + "000000000000000"
-
-        if operand == 99:
-            break
-        elif operand == 1:
-            in1 = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            in2 = create_argument(states[1],
-                                  instruction_sequence[program_counter + 2])
-            out = create_argument(states[2],
-                                  instruction_sequence[program_counter + 3])
-            compute_add(instruction_sequence, in1, in2, out)
-            program_counter += 4
-
-        elif operand == 2:
-            in1 = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            in2 = create_argument(states[1],
-                                  instruction_sequence[program_counter + 2])
-            out = create_argument(states[2],
-                                  instruction_sequence[program_counter + 3])
-            compute_multiply(instruction_sequence, in1, in2, out)
-            program_counter += 4
-        elif operand == 3:
-            out = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            take_input(instruction_sequence, out, io)
-            program_counter += 2
-        elif operand == 4:
-            in1 = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            print_output(instruction_sequence, in1, io)
-            program_counter += 2
-        elif operand == 5:
-            in1 = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            in2 = create_argument(states[1],
-                                  instruction_sequence[program_counter + 2])
-            program_counter = jump_if_true(instruction_sequence, in1, in2,
-                                           program_counter)
-        elif operand == 6:
-            in1 = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            in2 = create_argument(states[1],
-                                  instruction_sequence[program_counter + 2])
-            program_counter = jump_if_false(instruction_sequence, in1, in2,
-                                            program_counter)
-        elif operand == 7:
-            in1 = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            in2 = create_argument(states[1],
-                                  instruction_sequence[program_counter + 2])
-            out = create_argument(states[2],
-                                  instruction_sequence[program_counter + 3])
-            less_than(instruction_sequence, in1, in2, out)
-            program_counter += 4
-        elif operand == 8:
-            in1 = create_argument(states[0],
-                                  instruction_sequence[program_counter + 1])
-            in2 = create_argument(states[1],
-                                  instruction_sequence[program_counter + 2])
-            out = create_argument(states[2],
-                                  instruction_sequence[program_counter + 3])
-            equals(instruction_sequence, in1, in2, out)
-            program_counter += 4
-        else:
-            raise ValueError("Unknown operand" + operand)
+async def search_feedback_loops(program_sequence: List[int],
+                                phases: Tuple[int, ...]) \
+        -> Tuple[int, Tuple[int, ...]]:
+    """Runs the feedback loops of all phase permutations concurrently and
+    returns the biggest signal with its phases."""
+    permutations = list(itertools.permutations(phases))
+    signals = await asyncio.gather(
+        *(run_feedback_loop(program_sequence, permutation)
+          for permutation in permutations))
+    return max(zip(signals, permutations))
 
 
 if __name__ == "__main__":
     input_string = input()
 
-    phases = [9,8,7,6,5]
-
-    all_phases = itertools.permutations(phases)
-
-    biggest_amplifier_output = 0
-
-    # for phase_sequence in all_phases:
-    program_sequence = [int(x) for x in input_string.split(",")]
-
-    amplifier_output = ["0"]
-
-    print(amplifier_output)
-
-    for phase in phases:
-        io = CustomIO()
-        io.stdin = [phase] + amplifier_output
-        process_instructions(program_sequence, io)
-        amplifier_output = io.stdout
+    best, _ = search(input_string, itertools.permutations(range(5)),
+                     run_amplifiers)
 
-    print(amplifier_output)
+    print(best.value, best.candidate)
 
-    #     if amplifier_output > biggest_amplifier_output:
-    #         biggest_amplifier_output = amplifier_output
-    #
-    # print(biggest_amplifier_output)
+    program = [int(x) for x in input_string.split(",")]
+    print(*asyncio.run(search_feedback_loops(program, (5, 6, 7, 8, 9))))
 
 """
 3,15,3,16,1002,16,10,16,1,16,15,15,4,15,99,0,0
@@ -1,51 +1,165 @@
-
-def count_ones_and_zeroes(layer: str) -> int:
-    return layer.count("1") * layer.count("2")
-
-
-def count_zeroes(layer: str) -> int:
-    return layer.count("0")
+import mmap
+import sys
+from typing import List, Tuple, Optional, BinaryIO, Iterator
+
+try:
+    import numpy
+except ImportError:  # the decoder falls back to bytes operations
+    numpy = None
+
+WIDTH = 25
+HEIGHT = 6
+
+# pixels are kept as the ASCII digits of the encoded image
+BLACK = ord("0")
+WHITE = ord("1")
+TRANSPARENT = ord("2")
+
+PIXEL_CHARACTERS = bytes.maketrans(b"012", b".X ")
+
+
+def read_image(path: Optional[str] = None):
+    """The encoded image of a file mapped into memory, or read from stdin
+    without a path."""
+    if path is None:
+        return sys.stdin.buffer.read()
+    with open(path, "rb") as image_file:
+        return mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def decode_layers(data, width: int = WIDTH, height: int = HEIGHT):
+    """The complete layers of the encoded image, without copying the data.
+
+    With NumPy this is a (layers, height, width) uint8 array over the
+    digits, otherwise a list of memoryviews of a layer each."""
+    size = width * height
+    number_of_layers = len(data) // size
+    if numpy is not None:
+        return numpy.frombuffer(data, numpy.uint8, number_of_layers * size) \
+            .reshape(number_of_layers, height, width)
+
+    view = memoryview(data)
+    return [view[i * size:(i + 1) * size] for i in range(number_of_layers)]
+
+
+def layer_counts(layers) -> List[Tuple[int, int, int]]:
+    """Black, white and transparent pixels of every layer."""
+    if numpy is not None:
+        counts = numpy.stack([(layers == digit).sum(axis=(1, 2))
+                              for digit in (BLACK, WHITE, TRANSPARENT)],
+                             axis=1)
+        return [tuple(row) for row in counts.tolist()]
+
+    return [tuple(bytes(layer).count(digit)
+                  for digit in (BLACK, WHITE, TRANSPARENT))
+            for layer in layers]
+
+
+def checksum(layers) -> int:
+    """White times transparent pixels of the layer with fewest black ones."""
+    _, ones, twos = min(layer_counts(layers), key=lambda counts: counts[0])
+    return ones * twos
+
+
+def _fill_transparent(composite: bytearray, layer):
+    """Copies the pixels of a lower layer where `composite` is transparent."""
+    position = composite.find(TRANSPARENT)
+    while position >= 0:
+        composite[position] = layer[position]
+        position = composite.find(TRANSPARENT, position + 1)
+
+
+def composite_image(layers) -> bytes:
+    """The visible pixels, the first layer which isn't transparent at a
+    pixel gives its color. Pixels transparent in all layers stay so."""
+    if numpy is not None:
+        flat = layers.reshape(len(layers), -1)
+        first = numpy.argmax(flat != TRANSPARENT, axis=0)
+        return flat[first, numpy.arange(flat.shape[1])].tobytes()
+
+    composite = bytearray(layers[0])
+    for layer in layers[1:]:
+        if TRANSPARENT not in composite:
+            break
+        _fill_transparent(composite, layer)
+    return bytes(composite)
+
+
+def read_layers(stream: BinaryIO, size: int) -> Iterator[bytearray]:
+    """Reads layers of `size` pixels into a single buffer, which is
+    overwritten by the next layer. Short reads from pipes are continued
+    and an incomplete last layer is left out."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while True:
+        filled = 0
+        while filled < size:
+            count = stream.readinto(view[filled:])
+            if not count:
+                return
+            filled += count
+        yield buffer
+
+
+class LayerCompositor(object):
+    """Folds layers into the composite image and the checksum as they
+    arrive, so only the image is kept however many layers there are"""
+    composite: Optional[bytearray]
+    fewest_zeroes: Optional[int]
+    checksum: Optional[int]
+    number_of_layers: int
+
+    def __init__(self):
+        self.composite = None
+        self.fewest_zeroes = None
+        self.checksum = None
+        self.number_of_layers = 0
+
+    def add(self, layer):
+        zeroes = layer.count(BLACK)
+        if self.fewest_zeroes is None or zeroes < self.fewest_zeroes:
+            self.fewest_zeroes = zeroes
+            self.checksum = layer.count(WHITE) * layer.count(TRANSPARENT)
+
+        if self.composite is None:
+            self.composite = bytearray(layer)
+        elif TRANSPARENT in self.composite:
+            _fill_transparent(self.composite, layer)
+        self.number_of_layers += 1
+
+    def image(self) -> bytes:
+        return bytes(self.composite or b"")
+
+
+def stream_image(stream: BinaryIO, width: int = WIDTH,
+                 height: int = HEIGHT) -> LayerCompositor:
+    compositor = LayerCompositor()
+    for layer in read_layers(stream, width * height):
+        compositor.add(layer)
+    return compositor
+
+
+def print_image(image: bytes, width: int = WIDTH):
+    text = image.translate(PIXEL_CHARACTERS).decode()
+    for i in range(0, len(text), width):
+        print(text[i:i + width])
 
 
 def main():
-    width = 25
-    height = 6
-
-    encoded_image = input()
-
-    number_of_layers = len(encoded_image) // (width * height)
-
-    begin_index = 0
-    end_index = width * height
-
-    layers = []
-
-    for layer_index in range(number_of_layers):
-
-        layer = encoded_image[begin_index:end_index]
-
-        layers.append(layer)
-
-        begin_index = end_index
-        end_index = end_index + (width * height)
-
-    final_image = ""
-
-    for pixel in range(width * height):
-
-        for layer in layers:
-
-            if layer[pixel] == "0":  # black
-                final_image += "0"
-                break
-            if layer[pixel] == "1":  # white
-                final_image += "1"
-                break
-
-    for i in range(height):
-        pixel_row = final_image[i * width:(i*width) + width]
+    paths = [argument for argument in sys.argv[1:]
+             if not argument.startswith("--")]
+    path = paths[0] if paths else None
+
+    if "--stream" in sys.argv:
+        if path is None:
+            compositor = stream_image(sys.stdin.buffer)
+        else:
+            with open(path, "rb") as image_file:
+                compositor = stream_image(image_file)
+        print_image(compositor.image())
+    else:
+        print_image(composite_image(decode_layers(read_image(path))))
 
-        print(pixel_row.replace("1", "X").replace("0", "."))
 
 if __name__ == "__main__":
     main()
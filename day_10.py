@@ -1,4 +1,9 @@
-from typing import NamedTuple, Dict, List
+import itertools
+import sys
+from array import array
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Dict, List, Tuple, Optional
 import math
 
 class Pos(NamedTuple):
@@ -6,30 +11,22 @@ class Pos(NamedTuple):
     y: int
 
 
-class Data(object):
-    is_asteroid: bool
-    is_bfs_visited: bool
-    is_reachable: bool
-
-    def __init__(self, raw_input: chr):
-        if raw_input == ".":
-            self.is_asteroid = False
-        else:
-            self.is_asteroid = True
-        self.is_bfs_visited = False
-        self.is_reachable = True
-
-    def visit(self):
-        self.is_bfs_visited = True
-
-    def burn(self):
-        self.is_reachable = False
+# maps the characters of the input to 1 for asteroids and 0 for empty cells
+ASTEROID_TABLE = bytes(0 if char == ord(".") else 1 for char in range(256))
 
 
 class Map(object):
+    """Cell flags in bytearrays of one byte per cell, indexed by
+    y * width + x
+
+    Finds the visible asteroids with a BFS which hides the rays behind
+    every asteroid it meets, a slow but independent reference for the
+    DirectionIndex (see verify_visibility)."""
     width: int
     height: int
-    map: Dict[Pos, Data]
+    asteroids: bytearray
+    visited: bytearray  # by the BFS of visible_asteroids
+    reachable: bytearray  # not hidden behind a visible asteroid
     source: Pos
 
     def __init__(self, width: int, height: int, raw_input: List[str],
@@ -37,82 +34,237 @@ class Map(object):
         self.width = width
         self.height = height
 
-        self.map = {}
-        for h_index, line in enumerate(raw_input):
-            for w_index, char in enumerate(line):
-                self.map[Pos(w_index, h_index)] = Data(char)
-
-        if not self.map[source].is_asteroid:
-            raise ValueError("source must be asteroid")
-        self.source = source
+        self.asteroids = bytearray(
+            "".join(raw_input).encode().translate(ASTEROID_TABLE))
+        self.visited = bytearray(width * height)
+        self.reachable = bytearray(b"\1") * (width * height)
+        self.reset(source)
+
+    def index(self, pos: Pos) -> int:
+        return pos.y * self.width + pos.x
+
+    def reset(self, source: Optional[Pos] = None):
+        """Clears the flags of a previous scan and moves the station to
+        `source` if given, the asteroids stay."""
+        if source is not None:
+            if not self.contains(source) \
+                    or not self.asteroids[self.index(source)]:
+                raise ValueError("source must be asteroid")
+            self.source = source
+        self.visited[:] = bytes(len(self.visited))
+        self.reachable[:] = b"\1" * len(self.reachable)
 
     def contains(self, pos: Pos) -> bool:
-        if 0 <= pos.x < self.width and 0 <= pos.y < self.height:
-            return True
-        return False
-
-    @staticmethod
-    def _all_adjacent(pos: Pos) -> List[Pos]:
-        positions = []
-        for x in range(pos.x - 1, pos.x + 2, 1):
-            for y in range(pos.y - 1, pos.y + 2, 1):
-                adjacent = Pos(x, y)
-                if adjacent != pos:
-                    positions.append(adjacent)
-        return positions
-
-    def adjacent(self, pos: Pos) -> List[Pos]:
-        all_adjacent = self._all_adjacent(pos)
-        positions = []
-        for adjacent in all_adjacent:
-            if self.contains(adjacent):
-                positions.append(adjacent)
-        return positions
+        return 0 <= pos.x < self.width and 0 <= pos.y < self.height
+
+    def adjacent(self, index: int) -> List[int]:
+        """Indices of the neighbouring cells of the cell at `index`."""
+        y, x = divmod(index, self.width)
+        first_row = index - self.width if y > 0 else index
+        last_row = index + self.width if y < self.height - 1 else index
+        first_column = -1 if x > 0 else 0
+        last_column = 1 if x < self.width - 1 else 0
+        return [row + dx
+                for row in range(first_row, last_row + 1, self.width)
+                for dx in range(first_column, last_column + 1)
+                if row + dx != index]
 
     def difference(self, to: Pos) -> Pos:
-        difference = Pos(x=to.x - self.source.x, y=to.y - self.source.y)
-        divider = math.gcd(difference.x, difference.y)
-
-        difference = Pos(difference.x / divider, difference.y / divider)
-        return difference
+        return direction(self.source, to)
 
     def burn(self, difference: Pos):
-        current = Pos(self.source.x + difference.x,
-                      self.source.y + difference.y)
-        while self.contains(current):
-            self.map[current].burn()
-            current = Pos(current.x + difference.x, current.y + difference.y)
+        x = self.source.x + difference.x
+        y = self.source.y + difference.y
+        step = difference.y * self.width + difference.x
+        index = y * self.width + x
+        while 0 <= x < self.width and 0 <= y < self.height:
+            self.reachable[index] = 0
+            x += difference.x
+            y += difference.y
+            index += step
 
     def remove_asteroids(self, asteroids: List[Pos]):
         for asteroid in asteroids:
-            self.map[asteroid].is_asteroid = False
+            self.asteroids[self.index(asteroid)] = 0
 
     def visible_asteroids(self) -> List[Pos]:
+        """Scans from the source, after clearing the flags of a previous
+        scan."""
+        self.reset()
 
-        self.map[self.source].visit()
-        bfs_queue = [self.source]
+        source = self.index(self.source)
+        self.visited[source] = 1
+        bfs_queue = deque([source])
 
         visible_asteroids = []
 
         while bfs_queue:
-            current = bfs_queue.pop(0)
+            current = bfs_queue.popleft()
 
-            for adjacent in self.adjacent(current):
-                adjacent_data = self.map[adjacent]
+            for index in self.adjacent(current):
+                if not self.visited[index]:
+                    self.visited[index] = 1
+                    bfs_queue.append(index)
 
-                if not adjacent_data.is_bfs_visited:
-                    adjacent_data.visit()
-                    bfs_queue.append(adjacent)
-
-                    if adjacent_data.is_reachable \
-                            and adjacent_data.is_asteroid:
-                        visible_asteroids.append(adjacent)
-                        difference = self.difference(adjacent)
-                        self.burn(difference)
+                    if self.reachable[index] and self.asteroids[index]:
+                        y, x = divmod(index, self.width)
+                        asteroid = Pos(x, y)
+                        visible_asteroids.append(asteroid)
+                        self.burn(self.difference(asteroid))
 
         return visible_asteroids
 
 
+def asteroid_positions(raw_input: List[str]) -> List[Pos]:
+    return [Pos(x, y) for y, line in enumerate(raw_input)
+            for x, char in enumerate(line) if char != "."]
+
+
+def direction(source: Pos, to: Pos) -> Pos:
+    """The difference reduced by the gcd, the same for every position
+    on a ray from the source."""
+    dx = to.x - source.x
+    dy = to.y - source.y
+    divider = math.gcd(dx, dy)
+    return Pos(dx // divider, dy // divider)
+
+
+def clockwise_angle(difference: Pos) -> float:
+    """Angle from straight up, clockwise, in [0, 2 pi)."""
+    return math.atan2(difference.x, -difference.y) % (2 * math.pi)
+
+
+class DirectionIndex(object):
+    """The asteroids around a source grouped by direction, every group
+    sorted from the nearest to the farthest asteroid
+
+    Only the nearest asteroid of a group is visible, and the laser
+    vaporises the group's asteroids one per rotation."""
+    source: Pos
+    groups: Dict[Pos, List[Pos]]
+
+    def __init__(self, source: Pos, asteroids: List[Pos]):
+        self.source = source
+        self.groups = defaultdict(list)
+        for asteroid in asteroids:
+            if asteroid != source:
+                self.groups[direction(source, asteroid)].append(asteroid)
+
+        def distance(pos: Pos) -> int:
+            return abs(pos.x - source.x) + abs(pos.y - source.y)
+
+        for group in self.groups.values():
+            group.sort(key=distance)
+
+    def visible_count(self) -> int:
+        return len(self.groups)
+
+    def visible_asteroids(self) -> List[Pos]:
+        return [group[0] for group in self.groups.values()]
+
+    def vaporisation_order(self) -> List[Pos]:
+        """All asteroids in the order the laser vaporises them, by rotation
+        and within a rotation by angle."""
+        order = []
+        for difference, group in self.groups.items():
+            angle = clockwise_angle(difference)
+            for rotation, asteroid in enumerate(group):
+                order.append((rotation, angle, asteroid))
+        order.sort()
+        return [asteroid for _, _, asteroid in order]
+
+
+class DirectionTable(object):
+    """Reduced directions of all differences between positions of a field,
+    computed once and shared by every station
+
+    A position is keyed as x * stride + y, so the difference of two keys
+    identifies the difference of the positions and indexes `directions`,
+    which holds the key of the reduced difference. Only a zero difference
+    maps to 0."""
+    stride: int
+    offset: int  # added to a key difference to index `directions`
+    directions: array
+
+    def __init__(self, width: int, height: int):
+        self.stride = 2 * height - 1
+        self.offset = (width - 1) * self.stride + height - 1
+        self.directions = array("q", [0]) * ((2 * width - 1) * self.stride)
+        for dx in range(1 - width, width):
+            for dy in range(1 - height, height):
+                divider = math.gcd(dx, dy) or 1
+                self.directions[dx * self.stride + dy + self.offset] = \
+                    dx // divider * self.stride + dy // divider
+
+    def key(self, pos: Pos) -> int:
+        return pos.x * self.stride + pos.y
+
+    def visible_count(self, station: int, asteroids: List[int]) -> int:
+        """Asteroids seen from the station, one per distinct direction. The
+        station and the asteroids are keys, the station is one of them."""
+        directions = self.directions
+        base = self.offset - station
+        return len({directions[asteroid + base]
+                    for asteroid in asteroids}) - 1
+
+
+# direction table and asteroid keys sent once to each worker process
+_table: DirectionTable
+_keys: List[int] = []
+
+
+def _init_worker(table: DirectionTable, keys: List[int]):
+    global _table, _keys
+    _table = table
+    _keys = keys
+
+
+def _count_visible_batch(stations: List[int]) -> List[int]:
+    return [_table.visible_count(station, _keys) for station in stations]
+
+
+def best_station(asteroids: List[Pos], workers: int = 1,
+                 batch_size: int = 64) -> Tuple[Pos, int]:
+    """The asteroid seeing the most others and how many it sees.
+
+    With more than one worker the stations are scored in batches over a
+    pool of processes, which pays off for thousands of asteroids."""
+    table = DirectionTable(max(pos.x for pos in asteroids) + 1,
+                           max(pos.y for pos in asteroids) + 1)
+    keys = [table.key(asteroid) for asteroid in asteroids]
+
+    if workers <= 1:
+        counts = [table.visible_count(key, keys) for key in keys]
+    else:
+        batches = [keys[i:i + batch_size]
+                   for i in range(0, len(keys), batch_size)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(table, keys)) as executor:
+            counts = list(itertools.chain.from_iterable(
+                executor.map(_count_visible_batch, batches)))
+
+    count, station = max(zip(counts, asteroids), key=lambda pair: pair[0])
+    return station, count
+
+
+def verify_visibility(raw_input: List[str]) -> List[Pos]:
+    """Stations for which the DirectionIndex and a Map scan disagree on
+    the visible asteroids. One Map is reset for every station."""
+    asteroids = asteroid_positions(raw_input)
+    if not asteroids:
+        return []
+
+    scanner = Map(len(raw_input[0]), len(raw_input), raw_input, asteroids[0])
+    mismatches = []
+    for station in asteroids:
+        scanner.reset(station)
+        expected = set(scanner.visible_asteroids())
+        if set(DirectionIndex(station, asteroids).visible_asteroids()) \
+                != expected:
+            mismatches.append(station)
+    return mismatches
+
+
 def main():
     raw_input = []
 
@@ -123,44 +275,21 @@ def main():
             break
         raw_input.append(line)
 
-    width = len(raw_input[0])
-    height = len(raw_input)
-
-    source = Pos(11, 19)
+    workers = 1
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
 
-    def angle(pos: Pos):
-        in_source = source
+    # --verify checks the visibility of every station against a BFS scan
+    if "--verify" in sys.argv:
+        mismatches = verify_visibility(raw_input)
+        if mismatches:
+            raise RuntimeError("Visibility differs from the scan", mismatches)
 
-        dx = pos.x - in_source.x
-        dy = in_source.y - pos.y
+    asteroids = asteroid_positions(raw_input)
+    source, _ = best_station(asteroids, workers)
 
-        if dx >= 0 and dy > 0:
-            rad_ang = math.atan(dx / dy)
-        elif dx > 0 and dy <= 0:
-            rad_ang = math.atan(- dy / dx) + (math.pi / 2)
-        elif dx <= 0 and dy < 0:
-            rad_ang = math.atan(- dx / dy) + math.pi
-        elif dx < 0 and dy >= 0:
-            rad_ang = math.atan(dy / -dx) + (3 / 2) * math.pi
-        else:
-            rad_ang = 0.
-        # print(math.degrees(rad_ang))
-        return rad_ang
-
-    all_asteroids = []
-    index = 0
-    while True:
-        m = Map(width, height, raw_input, source)
-        m.remove_asteroids(all_asteroids)
-        asteroids = m.visible_asteroids()
-        all_asteroids += asteroids
-
-        if len(all_asteroids) >= 200:
-            asteroids.sort(key=lambda x: angle(x))
-            the_asteroid = asteroids[199 - index]
-            break
-        else:
-            index = len(all_asteroids)
+    index = DirectionIndex(source, asteroids)
+    the_asteroid = index.vaporisation_order()[199]
 
     print(the_asteroid)
 
@@ -194,8 +323,4 @@ if __name__ == '__main__':
 .#.#.###########.###
 #.#.#.#####.####.###
 ###.##.####.##.#..##
-"""
-
-"""
-Position 11,19 is the argmax for part 1
 """
\ No newline at end of file
@@ -1,9 +1,11 @@
-from collections import defaultdict
+import sys
 from enum import IntEnum
-from typing import Dict, List, Set
+from typing import List
 
 from computer import IntCodeComputer, IO, scan_program_from_input
-from mapping import C2
+from mapping import C2, ChunkedGrid
+from rendering import render_text, write_png, write_pbm
+from transcript import Transcript, TranscriptWriter
 
 
 class Rotation(IntEnum):
@@ -22,24 +24,30 @@ class Color(IntEnum):
     WHITE = 1
 
 
+# characters drawn for the colors and their gray levels in images
+COLOR_CHARACTERS = b".#"
+COLOR_LEVELS = bytes([0, 255])
+
+
 class Map(object):
-    map: Dict[C2, Color]
+    map: ChunkedGrid  # colors, painted panels are marked
     robot_coordinates: C2
     robot_rotation: Rotation
-    painted_panels: Set[C2]
 
     def __init__(self):
-        self.map = defaultdict(lambda: Color.BLACK)
+        self.map = ChunkedGrid(Color.BLACK)
         self.robot_coordinates = C2(0, 0)
         self.robot_rotation = Rotation.UP
-        self.painted_panels = set()
 
     def current_color(self) -> Color:
-        return self.map[self.robot_coordinates]
+        return Color(self.map[self.robot_coordinates])
 
     def paint(self, color: Color):
         self.map[self.robot_coordinates] = color
-        self.painted_panels.add(self.robot_coordinates)
+        self.map.mark(self.robot_coordinates)
+
+    def count_painted_panels(self) -> int:
+        return self.map.marked
 
     def set_paint(self, color: Color):
         self.map[self.robot_coordinates] = color
@@ -66,68 +74,64 @@ class Map(object):
             self.robot_coordinates = C2(self.robot_coordinates.x - 1,
                                         self.robot_coordinates.y)
 
+    def raster(self) -> List[bytes]:
+        self.map.include(self.robot_coordinates)
+        return self.map.rows()
+
     def print(self):
-        max_x = self.robot_coordinates.x
-        min_x = max_x
-        max_y = self.robot_coordinates.y
-        min_y = max_y
-        for coordinates in self.map.keys():
-            if coordinates.x > max_x:
-                max_x = coordinates.x
-            if coordinates.x < min_x:
-                min_x = coordinates.x
-            if coordinates.y > max_y:
-                max_y = coordinates.y
-            if coordinates.y < min_y:
-                min_y = coordinates.y
-
-        for y in range(min_y, max_y + 1):
-            row = ""
-            for x in range(min_x, max_x + 1):
-                color = self.map[C2(x, y)]
-                if color == Color.BLACK:
-                    row += "."
-                else:
-                    row += "#"
-            print(row)
+        sys.stdout.write(render_text(self.raster(), COLOR_CHARACTERS).decode())
 
 
 class MapIO(IO):
     map: Map
-    outputs: List[str]
+    chunk_size = 2  # color and rotation
 
     def __init__(self, the_map: Map):
         self.map = the_map
-        self.outputs = []
 
     def input(self) -> str:
         return str(self.map.current_color().value)
 
-    def output(self, out: str) -> None:
-        self.outputs.append(out)
-
-        if len(self.outputs) == 2:
-            color = Color(int(self.outputs.pop(0)))
-            rotation = self.outputs.pop(0)
-            self.map.paint(color)
-            if rotation == "0":
-                self.map.rotate_left_by_90()
-            elif rotation == "1":
-                self.map.rotate_right_by_90()
-            else:
-                raise ValueError("Unknown rotation", rotation)
-            self.map.step_forward()
+    def output_chunk(self, values: List[int]) -> None:
+        color, rotation = values
+        self.map.paint(Color(color))
+        if rotation == 0:
+            self.map.rotate_left_by_90()
+        elif rotation == 1:
+            self.map.rotate_right_by_90()
+        else:
+            raise ValueError("Unknown rotation", rotation)
+        self.map.step_forward()
 
 
 def main():
 
     the_map = Map()
     the_map.set_paint(Color.WHITE)
-    cpu = IntCodeComputer(scan_program_from_input(), MapIO(the_map))
-
-    cpu.run()
 
-    print(len(the_map.painted_panels))
+    # --replay FILE paints the hull from a recorded transcript instead of
+    # running the robot, --record FILE writes one
+    if "--replay" in sys.argv:
+        with open(sys.argv[sys.argv.index("--replay") + 1], "rb") as log:
+            Transcript.load(log).replay(MapIO(the_map))
+    else:
+        cpu = IntCodeComputer(scan_program_from_input(), MapIO(the_map))
+        if "--record" in sys.argv:
+            with open(sys.argv[sys.argv.index("--record") + 1], "wb") as log:
+                cpu.recorder = TranscriptWriter(log)
+                cpu.run()
+        else:
+            cpu.run()
+
+    print(the_map.count_painted_panels())
+
+    # --png FILE and --pbm FILE save the hull as an image
+    if "--png" in sys.argv:
+        with open(sys.argv[sys.argv.index("--png") + 1], "wb") as image:
+            write_png(image, the_map.raster(), COLOR_LEVELS)
+    if "--pbm" in sys.argv:
+        with open(sys.argv[sys.argv.index("--pbm") + 1], "wb") as image:
+            write_pbm(image, the_map.raster(), [Color.WHITE])
 
     the_map.print()
 
@@ -1,9 +1,14 @@
-from collections import defaultdict
+import math
+import os
+import sys
+import time
 from enum import IntEnum
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional, Callable
 
 from computer import IntCodeComputer, IO, scan_program_from_input
 from mapping import C2
+from rendering import render_text, write_png
+from transcript import Transcript, TranscriptWriter
 
 
 class Tile(IntEnum):
@@ -14,75 +19,152 @@ class Tile(IntEnum):
     BALL = 4
 
 
-class Screen(object):
-    pixels: Dict[C2, Tile]
+# characters drawn for the tiles and their gray levels in images
+TILE_CHARACTERS = b" |#_o"
+TILE_LEVELS = bytes([0, 128, 192, 255, 255])
+
 
-    def __init__(self):
-        self.pixels = defaultdict(lambda: Tile.EMPTY)
+class Screen(object):
+    """A framebuffer of tiles stored row by row in a bytearray"""
+    pixels: bytearray
+    width: int
+    height: int
+    min_x: int  # bounds of the drawn tiles
+    min_y: int
+    max_x: int
+    max_y: int
+    ball: Optional[C2]
+    paddle: Optional[C2]
+    blocks: int
+
+    def __init__(self, width: int = 38, height: int = 20):
+        self.pixels = bytearray(width * height)
+        self.width = width
+        self.height = height
+        self.min_x = self.min_y = sys.maxsize
+        self.max_x = self.max_y = -1
+        self.ball = None
+        self.paddle = None
+        self.blocks = 0
+
+    def tile(self, cord: C2) -> Tile:
+        """The tile at a coordinate, empty beyond the drawn screen."""
+        if cord.x < 0 or cord.y < 0:
+            raise ValueError("Tile out of the screen", cord)
+        if cord.x >= self.width or cord.y >= self.height:
+            return Tile.EMPTY
+        return Tile(self.pixels[cord.y * self.width + cord.x])
+
+    def _grow(self, width: int, height: int):
+        pixels = bytearray(width * height)
+        for y in range(self.height):
+            row = y * self.width
+            pixels[y * width:y * width + self.width] = \
+                self.pixels[row:row + self.width]
+        self.pixels = pixels
+        self.width = width
+        self.height = height
+
+    def set_tile(self, cord: C2, tile: Tile):
+        """Draws a tile keeping the ball, paddle and block count current."""
+        if cord.x < 0 or cord.y < 0:
+            raise ValueError("Tile out of the screen", cord)
+        if cord.x >= self.width or cord.y >= self.height:
+            width = self.width
+            if cord.x >= width:
+                width = max(2 * width, cord.x + 1)
+            height = self.height
+            if cord.y >= height:
+                height = max(2 * height, cord.y + 1)
+            self._grow(width, height)
+
+        index = cord.y * self.width + cord.x
+        previous = self.pixels[index]
+        if previous == Tile.BLOCK:
+            self.blocks -= 1
+        elif previous == Tile.BALL and self.ball == cord:
+            self.ball = None
+        elif previous == Tile.PADDLE and self.paddle == cord:
+            self.paddle = None
+
+        if tile == Tile.BLOCK:
+            self.blocks += 1
+        elif tile == Tile.BALL:
+            self.ball = cord
+        elif tile == Tile.PADDLE:
+            self.paddle = cord
+
+        self.pixels[index] = tile
+        self.min_x = min(self.min_x, cord.x)
+        self.min_y = min(self.min_y, cord.y)
+        self.max_x = max(self.max_x, cord.x)
+        self.max_y = max(self.max_y, cord.y)
 
     def count_blocks(self) -> int:
-        total = 0
-        for value in self.pixels.values():
-            if value == Tile.BLOCK:
-                total += 1
-        return total
+        return self.blocks
 
     def get_ball_and_paddle_positions(self) -> Dict[str, C2]:
-        paddle = None
-        ball = None
-        for cord, tile in self.pixels.items():
-            if tile == Tile.PADDLE:
-                paddle = cord
-            if tile == Tile.BALL:
-                ball = cord
-            if ball is not None and paddle is not None:
-                break
         return {
-            "ball": ball,
-            "paddle": paddle
+            "ball": self.ball,
+            "paddle": self.paddle
         }
 
+    def raster(self) -> List[bytes]:
+        """Rows of tiles between the bounds of the drawn tiles."""
+        rows = []
+        for y in range(self.min_y, self.max_y + 1):
+            begin = y * self.width
+            rows.append(bytes(self.pixels[begin + self.min_x:
+                                          begin + self.max_x + 1]))
+        return rows
+
     def print(self):
-        min_x = 99999999
-        min_y = 99999999
-        max_x = -99999999
-        max_y = -99999999
-        for cord, tile in self.pixels.items():
-            if cord.x < min_x:
-                min_x = cord.x
-            if cord.x > max_x:
-                max_x = cord.x
-            if cord.y < min_y:
-                min_y = cord.y
-            if cord.y > max_y:
-                max_y = cord.y
-        for h in range(min_y, max_y + 1):
-            line = ""
-            for w in range(min_x, max_x + 1):
-                t = self.pixels[C2(w, h)]
-                if t == Tile.EMPTY:
-                    line += " "
-                elif t == Tile.BLOCK:
-                    line += "#"
-                elif t == Tile.BALL:
-                    line += "o"
-                elif t == Tile.PADDLE:
-                    line += "_"
-                elif t == Tile.WALL:
-                    line += "|"
-            print(line)
+        sys.stdout.write(
+            render_text(self.raster(), TILE_CHARACTERS).decode())
+
+
+class FrameWriter(object):
+    """A frame sink saving every frame as a PNG image"""
+    directory: str
+    frames: int
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.frames = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, screen: Screen):
+        path = os.path.join(self.directory,
+                            "frame_{:06d}.png".format(self.frames))
+        with open(path, "wb") as image:
+            write_png(image, screen.raster(), TILE_LEVELS)
+        self.frames += 1
 
 
 class ArcadeIO(IO):
+    """Plays the game headless unless a frame sink is given, which then
+    gets the screen at most once per `frame_interval` seconds."""
     screen: Screen
-    stdout: List[str]
-
-    def __init__(self, screen: Screen):
+    chunk_size = 3  # x, y and tile or score
+    frame_sink: Optional[Callable[[Screen], None]]
+    frame_interval: float
+    last_frame: float
+
+    def __init__(self, screen: Screen,
+                 frame_sink: Optional[Callable[[Screen], None]] = None,
+                 frame_interval: float = 0.):
         self.screen = screen
-        self.stdout = []
+        self.frame_sink = frame_sink
+        self.frame_interval = frame_interval
+        self.last_frame = -math.inf
 
     def input(self) -> str:
-        self.screen.print()
+        if self.frame_sink is not None:
+            now = time.monotonic()
+            if now - self.last_frame >= self.frame_interval:
+                self.frame_sink(self.screen)
+                self.last_frame = now
+
         info = self.screen.get_ball_and_paddle_positions()
 
         ball = info["ball"]
@@ -97,30 +179,51 @@ class ArcadeIO(IO):
             return "-1"
         return "0"
 
-    def output(self, out: str) -> None:
-        self.stdout.append(out)
-
-        if len(self.stdout) == 3:
-            x = int(self.stdout[0])
-            y = int(self.stdout[1])
+    def output_chunk(self, values: List[int]) -> None:
+        x, y, value = values
 
-            if x == -1 and y == 0:
-                print("score:", int(self.stdout[2]))
-            else:
-                tile = Tile(int(self.stdout[2]))
-
-                self.screen.pixels[C2(x, y)] = tile
-
-            self.stdout = []
+        if x == -1 and y == 0:
+            print("score:", value)
+        else:
+            self.screen.set_tile(C2(x, y), Tile(value))
 
 
 def main():
+    # --headless plays without drawing, --frames DIRECTORY saves the frames
+    # as images instead and --fps limits the drawn frames
+    frame_sink = None if "--headless" in sys.argv else Screen.print
+    if "--frames" in sys.argv:
+        frame_sink = FrameWriter(sys.argv[sys.argv.index("--frames") + 1])
+    frame_interval = 0.
+    if "--fps" in sys.argv:
+        frame_interval = 1 / float(sys.argv[sys.argv.index("--fps") + 1])
+
     screen = Screen()
-    cpu = IntCodeComputer(scan_program_from_input(),
-                          ArcadeIO(screen))
+    arcade = ArcadeIO(screen, frame_sink, frame_interval)
+
+    # --replay FILE rebuilds the screen from a recorded transcript,
+    # optionally only up to --until N executed instructions
+    if "--replay" in sys.argv:
+        with open(sys.argv[sys.argv.index("--replay") + 1], "rb") as log:
+            transcript = Transcript.load(log)
+        stop = None
+        if "--until" in sys.argv:
+            stop = transcript.index_at(
+                int(sys.argv[sys.argv.index("--until") + 1]))
+        transcript.replay(arcade, stop)
+        screen.print()
+        return
+
+    cpu = IntCodeComputer(scan_program_from_input(), arcade)
     cpu.hard_set_memory_cell(0, 2)
 
-    cpu.run()
+    # --record FILE writes the IO transcript of the game
+    if "--record" in sys.argv:
+        with open(sys.argv[sys.argv.index("--record") + 1], "wb") as log:
+            cpu.recorder = TranscriptWriter(log)
+            cpu.run()
+    else:
+        cpu.run()
     # print(screen.count_blocks())
 
 
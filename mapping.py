@@ -1,7 +1,105 @@
-from typing import NamedTuple
+import sys
+from typing import NamedTuple, Dict, Tuple, List
 
 
 class C2(NamedTuple):
     """2D coordinates"""
     x: int
     y: int
+
+
+# chunks are squares of CHUNK_SIZE x CHUNK_SIZE cells
+CHUNK_BITS = 6
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+
+
+class ChunkedGrid(object):
+    """An unbounded 2D grid of byte values
+
+    Cells are stored in square bytearray chunks allocated on first write,
+    next to a bitset of marked cells per chunk. The bounding box of the
+    written cells is kept as they are written."""
+    chunks: Dict[Tuple[int, int], bytearray]
+    marks: Dict[Tuple[int, int], bytearray]  # bitsets of marked cells
+    marked: int  # number of marked cells
+    default: int  # value of cells never written
+    min_x: int
+    min_y: int
+    max_x: int
+    max_y: int
+
+    def __init__(self, default: int = 0):
+        self.chunks = {}
+        self.marks = {}
+        self.marked = 0
+        self.default = default
+        self.min_x = self.min_y = sys.maxsize
+        self.max_x = self.max_y = -sys.maxsize
+
+    def __getitem__(self, cord: C2) -> int:
+        chunk = self.chunks.get((cord.x >> CHUNK_BITS, cord.y >> CHUNK_BITS))
+        if chunk is None:
+            return self.default
+        return chunk[(cord.y & CHUNK_MASK) << CHUNK_BITS | cord.x & CHUNK_MASK]
+
+    def __setitem__(self, cord: C2, value: int):
+        key = (cord.x >> CHUNK_BITS, cord.y >> CHUNK_BITS)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = bytearray([self.default]) * (CHUNK_SIZE * CHUNK_SIZE)
+            self.chunks[key] = chunk
+        chunk[(cord.y & CHUNK_MASK) << CHUNK_BITS | cord.x & CHUNK_MASK] = \
+            value
+        self.include(cord)
+
+    def include(self, cord: C2):
+        """Extends the bounding box to contain the coordinates."""
+        if cord.x < self.min_x:
+            self.min_x = cord.x
+        if cord.x > self.max_x:
+            self.max_x = cord.x
+        if cord.y < self.min_y:
+            self.min_y = cord.y
+        if cord.y > self.max_y:
+            self.max_y = cord.y
+
+    def mark(self, cord: C2):
+        key = (cord.x >> CHUNK_BITS, cord.y >> CHUNK_BITS)
+        marks = self.marks.get(key)
+        if marks is None:
+            marks = bytearray(CHUNK_SIZE * CHUNK_SIZE // 8)
+            self.marks[key] = marks
+        index = (cord.y & CHUNK_MASK) << CHUNK_BITS | cord.x & CHUNK_MASK
+        bit = 1 << (index & 7)
+        if not marks[index >> 3] & bit:
+            marks[index >> 3] |= bit
+            self.marked += 1
+
+    def is_marked(self, cord: C2) -> bool:
+        marks = self.marks.get((cord.x >> CHUNK_BITS, cord.y >> CHUNK_BITS))
+        if marks is None:
+            return False
+        index = (cord.y & CHUNK_MASK) << CHUNK_BITS | cord.x & CHUNK_MASK
+        return bool(marks[index >> 3] & 1 << (index & 7))
+
+    def rows(self) -> List[bytes]:
+        """Rows of cell values within the bounding box."""
+        if self.min_x > self.max_x:
+            return []
+
+        width = self.max_x - self.min_x + 1
+        empty = bytes([self.default]) * CHUNK_SIZE
+        first_chunk = self.min_x >> CHUNK_BITS
+        last_chunk = self.max_x >> CHUNK_BITS
+        offset = self.min_x - (first_chunk << CHUNK_BITS)
+
+        rows = []
+        for y in range(self.min_y, self.max_y + 1):
+            begin = (y & CHUNK_MASK) << CHUNK_BITS
+            row = b"".join(
+                self.chunks[x, y >> CHUNK_BITS][begin:begin + CHUNK_SIZE]
+                if (x, y >> CHUNK_BITS) in self.chunks else empty
+                for x in range(first_chunk, last_chunk + 1))
+            rows.append(row[offset:offset + width])
+        return rows
@@ -0,0 +1,194 @@
+import asyncio
+from typing import List, Dict, Set, Iterable, Optional
+
+from computer import IntCodeComputer, Status
+
+
+class Network(object):
+    """IntCodeComputers running as asyncio tasks
+
+    Every computer reads its inputs from its own bounded queue and its
+    outputs are put into the queues of all computers connected to it, so
+    chains, rings and fan-outs can be built with connect()."""
+    computers: Dict[str, IntCodeComputer]
+    queues: Dict[str, asyncio.Queue]  # input queue of each computer
+    consumers: Dict[str, List[str]]  # where the outputs of a computer go
+    last_outputs: Dict[str, Optional[int]]
+    halted: Set[str]
+    blocked: Set[str]  # computers waiting for an input
+    sending: Dict[str, str]  # computers waiting for room in a consumer queue
+    queue_size: int
+
+    def __init__(self, queue_size: int = 16):
+        self.computers = {}
+        self.queues = {}
+        self.consumers = {}
+        self.last_outputs = {}
+        self.halted = set()
+        self.blocked = set()
+        self.sending = {}
+        self.queue_size = queue_size
+
+    def add(self, name: str, computer: IntCodeComputer,
+            inputs: Iterable[int] = ()):
+        """Adds a computer with its first input values (e.g. a phase)."""
+        self.computers[name] = computer
+        self.consumers[name] = []
+        self.last_outputs[name] = None
+        computer.send_input(*inputs)
+
+    def connect(self, source: str, destination: str):
+        self.consumers[source].append(destination)
+
+    def chain(self, names: List[str]):
+        for source, destination in zip(names, names[1:]):
+            self.connect(source, destination)
+
+    def ring(self, names: List[str]):
+        self.chain(names + names[:1])
+
+    async def run(self) -> Dict[str, Optional[int]]:
+        """Runs until every computer halts and returns the last output of
+        each of them. Raises RuntimeError when all computers which did not
+        halt wait for an input or for room in a full queue, which can
+        never come."""
+        self.queues = {name: asyncio.Queue(self.queue_size)
+                       for name in self.computers}
+        self.halted = set()
+        self.blocked = set()
+        self.sending = {}
+
+        finished = asyncio.get_running_loop().create_future()
+        tasks = [asyncio.create_task(self._run_computer(name, finished))
+                 for name in self.computers]
+        try:
+            await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return dict(self.last_outputs)
+
+    async def _run_computer(self, name: str, finished: asyncio.Future):
+        computer = self.computers[name]
+        queue = self.queues[name]
+
+        try:
+            while True:
+                status = computer.run_until_io()
+
+                if status == Status.OUTPUT:
+                    value = computer.drain_outputs()[0]
+                    self.last_outputs[name] = value
+                    for consumer in self.consumers[name]:
+                        if consumer in self.halted:
+                            continue
+                        if self.queues[consumer].full():
+                            self.sending[name] = consumer
+                            self._check(finished)
+                        await self.queues[consumer].put(value)
+                        self.sending.pop(name, None)
+
+                    # put() only waits on a full queue, every output gives
+                    # the other computers a turn
+                    await asyncio.sleep(0)
+                    continue
+
+                if status == Status.HALTED:
+                    break
+
+                if queue.empty():
+                    self.blocked.add(name)
+                    self._check(finished)
+                computer.send_input(await queue.get())
+                self.blocked.discard(name)
+        except Exception as error:
+            if not finished.done():
+                finished.set_exception(error)
+            return
+
+        self.halted.add(name)
+        self._check(finished)
+
+        # keep taking values so that nobody gets stuck on a full queue
+        while True:
+            await queue.get()
+
+    def _check(self, finished: asyncio.Future):
+        if finished.done():
+            return
+        running = set(self.computers) - self.halted
+        if not running:
+            finished.set_result(None)
+        elif all(self._waiting(name) for name in running):
+            finished.set_exception(RuntimeError(
+                "Deadlock, waiting for input or queue space",
+                sorted(running)))
+
+    def _waiting(self, name: str) -> bool:
+        if name in self.sending:
+            return self.queues[self.sending[name]].full()
+        return name in self.blocked and self.queues[name].empty()
+
+
+def summing_program(n: int) -> List[int]:
+    """Reads n inputs and outputs their sum."""
+    program = [3, 101,  # [101] = input
+               1, 100, 101, 100,  # [100] += [101]
+               1001, 102, -1, 102,  # [102] -= 1
+               1005, 102, 0,  # loop while [102] != 0
+               4, 100,
+               99]
+    return program + [0] * (102 - len(program)) + [n]
+
+
+async def check_never_halting_producer():
+    """A producer which never halts feeds two consumers, which still get
+    their turns and halt."""
+    network = Network(queue_size=4)
+    network.add("producer", IntCodeComputer([104, 1, 1105, 1, 0], None))
+    for consumer in ("first", "second"):
+        network.add(consumer, IntCodeComputer(summing_program(10), None))
+        network.connect("producer", consumer)
+
+    try:
+        await asyncio.wait_for(network.run(), 5)
+    except asyncio.TimeoutError:
+        pass
+    assert network.halted == {"first", "second"}, network.halted
+    assert network.last_outputs["first"] == 10
+    assert network.last_outputs["second"] == 10
+
+
+async def check_burst():
+    """A burst of outputs bigger than the queues is held back by them."""
+    network = Network(queue_size=4)
+    burst = [value for i in range(50) for value in (104, i)] + [99]
+    network.add("producer", IntCodeComputer(burst, None))
+    network.add("consumer", IntCodeComputer(summing_program(50), None))
+    network.connect("producer", "consumer")
+
+    queue_lengths = []
+
+    async def watch():
+        while True:
+            queue_lengths.append(network.queues["consumer"].qsize())
+            await asyncio.sleep(0)
+
+    watcher = asyncio.ensure_future(watch())
+    outputs = await network.run()
+    watcher.cancel()
+
+    assert outputs["consumer"] == sum(range(50)), outputs
+    assert max(queue_lengths) <= 4, max(queue_lengths)
+
+
+def main():
+    asyncio.run(check_never_halting_producer())
+    asyncio.run(check_burst())
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import time
+from collections import Counter, defaultdict
+from typing import List, Dict, TextIO
+
+OPCODE_NAMES = {1: "add", 2: "multiply", 3: "input", 4: "output",
+                5: "jump_if_true", 6: "jump_if_false", 7: "less_than",
+                8: "equals", 9: "adjust_rb", 99: "halt"}
+
+
+class Profiler(object):
+    """Execution statistics of an IntCodeComputer.run
+
+    Instruction timings include the time spent in the IO, which is also
+    summed up separately in io_seconds."""
+    pc_counts: Counter  # executions by address
+    pc_seconds: Dict[int, float]
+    pc_opcodes: Dict[int, int]  # last opcode executed at an address
+    pc_blocks: Dict[int, int]  # start of the basic block of an address
+    opcode_counts: Counter
+    opcode_seconds: Dict[int, float]
+    block_counts: Counter  # basic block entries by start address
+    io_seconds: float
+
+    def __init__(self):
+        self.pc_counts = Counter()
+        self.pc_seconds = defaultdict(float)
+        self.pc_opcodes = {}
+        self.pc_blocks = {}
+        self.opcode_counts = Counter()
+        self.opcode_seconds = defaultdict(float)
+        self.block_counts = Counter()
+        self.io_seconds = 0.
+
+    def record(self, pc: int, opcode: int, block: int, seconds: float):
+        self.pc_counts[pc] += 1
+        self.pc_seconds[pc] += seconds
+        self.pc_opcodes[pc] = opcode
+        self.pc_blocks[pc] = block
+        self.opcode_counts[opcode] += 1
+        self.opcode_seconds[opcode] += seconds
+
+    def enter_block(self, start: int):
+        self.block_counts[start] += 1
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "pc_counts": dict(sorted(self.pc_counts.items())),
+            "opcodes": {OPCODE_NAMES[opcode]: {
+                "count": count, "seconds": self.opcode_seconds[opcode]}
+                for opcode, count in sorted(self.opcode_counts.items())},
+            "blocks": dict(sorted(self.block_counts.items())),
+            "io_seconds": self.io_seconds,
+        }
+
+    def write_json(self, output: TextIO):
+        json.dump(self.to_dict(), output, indent=2)
+
+    def collapsed_stacks(self) -> List[str]:
+        """Lines of the collapsed stack format taken by flame graph tools,
+        weighted by microseconds."""
+        return ["block {};{} at {} {}".format(
+                    self.pc_blocks[pc], OPCODE_NAMES[self.pc_opcodes[pc]], pc,
+                    round(seconds * 1e6))
+                for pc, seconds in sorted(self.pc_seconds.items())]
+
+    def write_collapsed(self, output: TextIO):
+        for line in self.collapsed_stacks():
+            output.write(line + "\n")
+
+
+class ProfiledIO(object):
+    """Wraps an IO and measures the time spent in it"""
+
+    def __init__(self, io, profiler: Profiler):
+        self.io = io
+        self.profiler = profiler
+        self.chunk_size = io.chunk_size
+
+    def input(self) -> str:
+        start = time.perf_counter()
+        value = self.io.input()
+        self.profiler.io_seconds += time.perf_counter() - start
+        return value
+
+    def output_chunk(self, values: List[int]) -> None:
+        start = time.perf_counter()
+        self.io.output_chunk(values)
+        self.profiler.io_seconds += time.perf_counter() - start
@@ -0,0 +1,60 @@
+import struct
+import zlib
+from typing import List, BinaryIO, Iterable
+
+# grids are rendered from rows of cell values with one byte per cell, the
+# values are mapped to output bytes with bytes.translate
+
+
+def value_table(values: Iterable[int], default: int = 0) -> bytes:
+    """A translation table mapping cell value i to `values[i]`."""
+    table = bytearray([default]) * 256
+    for index, value in enumerate(values):
+        table[index] = value
+    return bytes(table)
+
+
+def render_text(rows: List[bytes], characters: bytes) -> bytes:
+    """Lines of text, `characters[i]` is drawn for the cell value i."""
+    table = value_table(characters, ord("?"))
+    return b"".join(row.translate(table) + b"\n" for row in rows)
+
+
+def write_pbm(output: BinaryIO, rows: List[bytes], black: Iterable[int]):
+    """Writes a binary PBM bitmap, cells with values in `black` are black
+    and all the others white."""
+    height = len(rows)
+    width = len(rows[0]) if rows else 0
+    padding = b"0" * (-width % 8)
+
+    # every row becomes a string of binary digits and so a single number
+    digits = bytearray(b"0" * 256)
+    for value in black:
+        digits[value] = ord("1")
+
+    output.write(b"P4\n%d %d\n" % (width, height))
+    for row in rows:
+        number = int(row.translate(digits) + padding, 2)
+        output.write(number.to_bytes((width + 7) // 8, "big"))
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data \
+        + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(output: BinaryIO, rows: List[bytes], levels: bytes):
+    """Writes an 8 bit grayscale PNG, `levels[i]` is the gray level of the
+    cell value i."""
+    height = len(rows)
+    width = len(rows[0]) if rows else 0
+    table = value_table(levels)
+
+    # every scanline starts with its filter type, 0 means no filter
+    scanlines = b"".join(b"\0" + row.translate(table) for row in rows)
+
+    output.write(b"\x89PNG\r\n\x1a\n")
+    output.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height,
+                                                 8, 0, 0, 0, 0)))
+    output.write(_png_chunk(b"IDAT", zlib.compress(scanlines)))
+    output.write(_png_chunk(b"IEND", b""))
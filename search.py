@@ -0,0 +1,127 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, NamedTuple, Dict, Tuple, Callable, Iterable, \
+    Optional
+
+Candidate = Tuple[int, ...]
+Evaluate = Callable[[List[int], Candidate], int]
+
+# program parsed once by each worker process
+_program: List[int] = []
+
+
+class SearchResult(NamedTuple):
+    """The candidate input vector and the value it evaluated to"""
+    candidate: Candidate
+    value: int
+
+
+class WorkerStats(NamedTuple):
+    """Work done by one worker process"""
+    evaluated: int
+    seconds: float
+
+    def throughput(self) -> float:
+        """Evaluated candidates per second."""
+        if self.seconds == 0:
+            return 0.
+        return self.evaluated / self.seconds
+
+
+class BatchResult(NamedTuple):
+    pid: int
+    evaluated: int
+    seconds: float
+    best: Optional[SearchResult]
+
+
+def _init_worker(program_string: str):
+    global _program
+    _program = [int(x) for x in program_string.split(",")]
+
+
+def _evaluate_batch(evaluate: Evaluate, target: Optional[int],
+                    batch: List[Candidate]) -> BatchResult:
+    start = time.perf_counter()
+    best = None
+    evaluated = 0
+
+    for candidate in batch:
+        value = evaluate(_program, candidate)
+        evaluated += 1
+
+        if target is not None:
+            if value == target:
+                best = SearchResult(candidate, value)
+                break
+        elif best is None or value > best.value:
+            best = SearchResult(candidate, value)
+
+    return BatchResult(os.getpid(), evaluated,
+                       time.perf_counter() - start, best)
+
+
+def search(program_string: str, candidates: Iterable[Candidate],
+           evaluate: Evaluate, target: Optional[int] = None,
+           workers: Optional[int] = None, batch_size: int = 64) \
+        -> Tuple[Optional[SearchResult], Dict[int, WorkerStats]]:
+    """Evaluates candidate input vectors over a pool of processes.
+
+    Each worker parses `program_string` once and calls
+    `evaluate(program, candidate)` for its candidates; `evaluate` must not
+    modify the program and has to be a module level function so that it
+    can be pickled. With a `target` the search stops at the first candidate
+    evaluating to it, otherwise the candidate with the largest value wins.
+
+    Returns the result (None if the target was not found) and the work
+    statistics of every worker process by its pid."""
+    workers = workers or os.cpu_count() or 1
+    candidates = iter(candidates)
+    batches = iter(lambda: list(itertools.islice(candidates, batch_size)),
+                   [])
+
+    best = None
+    stats: Dict[int, WorkerStats] = {}
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(program_string,)) as executor:
+        pending = set()
+        done_submitting = False
+
+        while True:
+            # keep a bounded number of batches in flight so that nothing
+            # more is submitted once the target has been found
+            while not done_submitting and len(pending) < 2 * workers:
+                batch = next(batches, None)
+                if batch is None:
+                    done_submitting = True
+                    break
+                pending.add(executor.submit(_evaluate_batch, evaluate,
+                                            target, batch))
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+
+                evaluated, seconds = stats.get(result.pid, (0, 0.))
+                stats[result.pid] = WorkerStats(evaluated + result.evaluated,
+                                                seconds + result.seconds)
+
+                if result.best is None:
+                    continue
+                if target is not None:
+                    if best is None:
+                        best = result.best
+                elif best is None or result.best.value > best.value:
+                    best = result.best
+
+            if target is not None and best is not None:
+                for future in pending:
+                    future.cancel()
+                break
+
+    return best, stats
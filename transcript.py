@@ -0,0 +1,140 @@
+import bisect
+from typing import List, NamedTuple, BinaryIO, Optional
+
+MAGIC = b"ICT1"
+
+INPUT = 0
+OUTPUT = 1
+
+
+class Event(NamedTuple):
+    """An input or output value with the instruction count at that time"""
+    kind: int
+    cycles: int
+    value: int
+
+
+def _write_varint(stream: BinaryIO, number: int):
+    """Writes an unsigned number 7 bits per byte."""
+    data = bytearray()
+    while number > 0x7f:
+        data.append(number & 0x7f | 0x80)
+        number >>= 7
+    data.append(number)
+    stream.write(data)
+
+
+def _read_varint(data: bytes, offset: int):
+    number = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+
+def _zigzag(number: int) -> int:
+    return number * 2 if number >= 0 else -number * 2 - 1
+
+
+def _unzigzag(number: int) -> int:
+    return number // 2 if number % 2 == 0 else -(number + 1) // 2
+
+
+class TranscriptWriter(object):
+    """Records the IO of an IntCodeComputer to a binary stream
+
+    Every event takes a kind byte, the instructions executed since the
+    previous event and the zigzag encoded value, both as varints."""
+    stream: BinaryIO
+    cycles: int  # instruction count of the previous event
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.cycles = 0
+        self.stream.write(MAGIC)
+
+    def record(self, kind: int, cycles: int, value: int):
+        self.stream.write(bytes([kind]))
+        _write_varint(self.stream, cycles - self.cycles)
+        _write_varint(self.stream, _zigzag(value))
+        self.cycles = cycles
+
+
+class Transcript(object):
+    """Recorded IO which rebuilds the state of an IO without running the
+    program, by handing it the recorded outputs"""
+    events: List[Event]
+    position: int  # index of the next event to replay
+    pending: List[int]  # outputs of a chunk cut off by the previous stop
+
+    def __init__(self, events: List[Event]):
+        self.events = events
+        self.position = 0
+        self.pending = []
+
+    @staticmethod
+    def load(stream: BinaryIO) -> 'Transcript':
+        data = stream.read()
+        if not data.startswith(MAGIC):
+            raise ValueError("Not an Intcode transcript")
+
+        events = []
+        cycles = 0
+        offset = len(MAGIC)
+        while offset < len(data):
+            kind = data[offset]
+            delta, offset = _read_varint(data, offset + 1)
+            value, offset = _read_varint(data, offset)
+            cycles += delta
+            events.append(Event(kind, cycles, _unzigzag(value)))
+        return Transcript(events)
+
+    def outputs(self) -> List[int]:
+        return [event.value for event in self.events if event.kind == OUTPUT]
+
+    def index_at(self, cycles: int) -> int:
+        """Index of the first event after `cycles` instructions."""
+        return bisect.bisect_right([event.cycles for event in self.events],
+                                   cycles)
+
+    def seek(self, position: int):
+        """Moves to an event index. The next replay starts at the chunk
+        containing it."""
+        self.position = max(0, min(position, len(self.events)))
+        self.pending = []
+
+    def _chunk_start(self, chunk_size: int) -> int:
+        """Index of the first event of the output chunk at `position`."""
+        position = self.position
+        partial = sum(1 for event in self.events[:position]
+                      if event.kind == OUTPUT) % chunk_size
+        while partial:
+            position -= 1
+            if self.events[position].kind == OUTPUT:
+                partial -= 1
+        return position
+
+    def replay(self, io, stop: Optional[int] = None):
+        """Hands the outputs from the current position up to the event at
+        `stop` (the end by default) to the IO in its chunks. Replaying
+        from the start rebuilds the IO state at any point. A chunk cut off
+        at `stop` is completed by the next replay."""
+        stop = len(self.events) if stop is None else min(stop,
+                                                         len(self.events))
+        if not self.pending:
+            self.position = min(self._chunk_start(io.chunk_size), stop)
+
+        chunk = self.pending
+        for event in self.events[self.position:stop]:
+            if event.kind != OUTPUT:
+                continue
+            chunk.append(event.value)
+            if len(chunk) == io.chunk_size:
+                io.output_chunk(chunk)
+                chunk = []
+        self.pending = chunk
+        self.position = max(self.position, stop)